@@ -3,8 +3,6 @@ from .models import (
     Product,
     Measurement,
     PersonCard,
-    Vitamin,
-    MicroElement,
     ProductWeight,
     Recipe,
     Eating,
@@ -12,6 +10,7 @@ from .models import (
     ProductCategory,
     Water,
     FAQ,
+    DailyIntake,
 )
 
 
@@ -27,7 +26,11 @@ class ProductAdmin(admin.ModelAdmin):
     fieldsets = [
         ("Основная информация", {"fields": ["title"]}),
         ("Пищевая ценность", {"fields": ["proteins", "fats", "carbohydrates", "calories", "water"]}),
-        ("Микроэлементы и Витамины", {"fields": ["microelements", "vitamins"]}),
+        (
+            "Витамины",
+            {"fields": ["vitamin_a", "vitamin_b1", "vitamin_b2", "vitamin_b3", "vitamin_e", "vitamin_c"]},
+        ),
+        ("Микроэлементы", {"fields": ["iron", "calcium", "sodium", "potassium", "phosphorus"]}),
         ("Пропорции", {"fields": ["proteins_proportion", "fats_proportion", "carbohydrates_proportion"]}),
         ("Категория рекомендаций", {"fields": ["category"]}),
     ]
@@ -39,37 +42,21 @@ class ProductAdmin(admin.ModelAdmin):
         "carbohydrates",
         "calories",
         "water",
-        "microelements",
-        "vitamins",
-        "proteins_proportion",
-        "fats_proportion",
-        "carbohydrates_proportion",
-        "category",
-    )
-
-
-class VitaminAdmin(admin.ModelAdmin):
-    list_per_page = 20
-    readonly_fields = (
-        "id",
-        "a",
-        "b1",
-        "b2",
-        "b3",
-        "e",
-        "c",
-    )
-
-
-class MicroElementAdmin(admin.ModelAdmin):
-    list_per_page = 20
-    readonly_fields = (
-        "id",
+        "vitamin_a",
+        "vitamin_b1",
+        "vitamin_b2",
+        "vitamin_b3",
+        "vitamin_e",
+        "vitamin_c",
         "iron",
         "calcium",
         "sodium",
         "potassium",
         "phosphorus",
+        "proteins_proportion",
+        "fats_proportion",
+        "carbohydrates_proportion",
+        "category",
     )
 
 
@@ -80,7 +67,7 @@ class ProductCategoryAdmin(admin.ModelAdmin):
 
 
 class PersonCardAdmin(admin.ModelAdmin):
-    list_display = ("id", "person", "person_id", "height", "age", "gender", "target", "activity")
+    list_display = ("id", "person", "person_id", "height", "age", "gender", "target", "activity", "time_zone")
     list_display_links = ("person",)
     list_per_page = 20
 
@@ -121,8 +108,13 @@ class RecipeAdmin(admin.ModelAdmin):
     list_per_page = 20
 
 
-admin.site.register(Vitamin, VitaminAdmin)
-admin.site.register(MicroElement, MicroElementAdmin)
+class DailyIntakeAdmin(admin.ModelAdmin):
+    list_display = ("id", "person_card", "date", "calories", "proteins", "fats", "carbohydrates", "water")
+    list_filter = ("date",)
+    search_fields = ("person_card__person__email",)
+    list_per_page = 20
+
+
 admin.site.register(ProductWeight)
 admin.site.register(Water)
 admin.site.register(Eating, EatingAdmin)
@@ -133,3 +125,4 @@ admin.site.register(PersonCard, PersonCardAdmin)
 admin.site.register(FemaleType)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(FAQ)
+admin.site.register(DailyIntake, DailyIntakeAdmin)
@@ -1,12 +1,50 @@
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
-from bood_app.serializers import CalculateSerializer, RecommendationSerializer
+from bood_app.serializers import (
+    CalculateSerializer,
+    RecommendationSerializer,
+    HistorySerializer,
+    SummarySerializer,
+    MealPlanSerializer,
+    ProductAutocompleteSerializer,
+)
 
 ####################################################
 
 product_list_summary = extend_schema_view(
-    list=extend_schema(summary="Получение списка продуктов (есть фильтрация)", description="Поиск по названию продукта")
+    list=extend_schema(
+        parameters=[OpenApiParameter("expand", OpenApiTypes.STR, OpenApiParameter.QUERY, enum=["micro"])],
+        summary="Получение списка продуктов (есть фильтрация)",
+        description="Поиск по названию продукта. С expand=micro - полный профиль нутриентов, "
+        "как в карточке продукта",
+    ),
+    retrieve=extend_schema(
+        summary="Карточка продукта",
+        description="Пропорции БЖУ, категория, витамины и микроэлементы продукта",
+    ),
+)
+
+product_autocomplete_summary = extend_schema(
+    parameters=[
+        OpenApiParameter("q", OpenApiTypes.STR, OpenApiParameter.QUERY),
+        OpenApiParameter("size", OpenApiTypes.INT, OpenApiParameter.QUERY),
+    ],
+    summary="Подсказки названий продуктов",
+    description="Самые популярные продукты, одно из слов названия которых начинается с q"
+    "(без учета регистра, ё = е). Количество - size, по умолчанию 10, максимум 50",
+    request=None,
+    responses=ProductAutocompleteSerializer,
+)
+
+product_snapshot_summary = extend_schema(
+    parameters=[OpenApiParameter("since", OpenApiTypes.INT, OpenApiParameter.QUERY)],
+    summary="Снимок каталога продуктов",
+    description="Весь каталог одним сжатым gzip JSON: version, fields, products (строки значений в порядке fields) "
+    "и deleted. С since - только продукты, измененные и удаленные после этой версии каталога. "
+    "Поддерживается условный запрос по ETag",
+    request=None,
+    responses={200: OpenApiTypes.BINARY},
 )
 
 ####################################################
@@ -100,6 +138,27 @@ calculate_standard_retrieve_summary = extend_schema(
     request=None,
     responses=CalculateSerializer,
 )
+
+calculate_summary_retrieve_summary = extend_schema(
+    parameters=[OpenApiParameter("date", OpenApiTypes.DATE, OpenApiParameter.QUERY)],
+    summary="Получение сводки КБЖУ пользователя на определенную дату",
+    description="ИМТ, нормативные и текущие КБЖУ, остаток до нормы и процент ее выполнения одним запросом."
+    "Если дата не передана, значения передаются на текущую дату",
+    request=None,
+    responses=SummarySerializer,
+)
+
+calculate_history_retrieve_summary = extend_schema(
+    parameters=[
+        OpenApiParameter("from", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+        OpenApiParameter("to", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+    ],
+    summary="Получение истории текущих и нормативных КБЖУ пользователя за период",
+    description="Получение текущих и нормативных КБЖУ и действующих замеров по дням за период (не более 366 дней)."
+    "Если даты не переданы, значения передаются за последние 30 дней",
+    request=None,
+    responses=HistorySerializer,
+)
 ####################################################
 
 recommendation_summary = extend_schema(
@@ -111,3 +170,17 @@ recommendation_summary = extend_schema(
 )
 
 ####################################################
+
+mealplan_summary = extend_schema(
+    parameters=[
+        OpenApiParameter("date", OpenApiTypes.DATE, OpenApiParameter.QUERY),
+        OpenApiParameter("size", OpenApiTypes.INT, OpenApiParameter.QUERY),
+    ],
+    summary="Получить план питания на остаток КБЖУ",
+    description="Подбор граммовок не исключенных продуктов (не более size, по умолчанию 4, максимум 10),"
+    "закрывающих остаток КБЖУ до нормы на дату. Если дата не передана, план строится на текущую дату",
+    request=None,
+    responses=MealPlanSerializer,
+)
+
+####################################################
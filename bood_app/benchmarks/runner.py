@@ -0,0 +1,161 @@
+import datetime
+import json
+import platform
+import statistics
+import time
+from typing import Callable, Iterable, Optional
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bood_app.benchmarks.synthetic import create_catalog, create_persons
+from bood_app.models import PersonCard
+from bood_app.services.kbjy import KBJYService, RecommendationService, get_recommendation
+from bood_app.services.mealplan import MealPlanService
+from bood_app.services.product_index import clear_product_index
+
+CATALOG_SIZES = (1000, 10000, 100000)
+REGRESSION_THRESHOLD = 1.5
+# Разница во времени меньше этой считается шумом
+REGRESSION_MIN_MS = 1.0
+
+
+def measure(func: Callable, repeat: int) -> dict:
+    """
+    Время и число запросов первого вызова с пустыми кэшами и медиана повторных вызовов
+    """
+    cache.clear()
+    clear_product_index()
+    with CaptureQueriesContext(connection) as cold_queries:
+        started = time.perf_counter()
+        func()
+        cold_ms = (time.perf_counter() - started) * 1000
+
+    timings = []
+    warm_queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        warm_queries = len(queries)
+    return {
+        "cold_ms": round(cold_ms, 3),
+        "warm_ms": round(statistics.median(timings), 3) if timings else round(cold_ms, 3),
+        "cold_queries": len(cold_queries),
+        "warm_queries": warm_queries if timings else len(cold_queries),
+    }
+
+
+def get_cases(person_card: PersonCard) -> dict:
+    """
+    Замеряемые операции для карточки пользователя
+    """
+    date = person_card.get_local_date()
+    client = APIClient()
+    client.force_authenticate(person_card.person)
+
+    def get_view(name: str) -> Callable:
+        url = reverse(name)
+
+        def view() -> None:
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: {response.status_code} {response.data}")
+
+        return view
+
+    return {
+        "kbjy.get_current": lambda: KBJYService(person_card, date).get_current(),
+        "kbjy.get_standard": lambda: KBJYService(person_card, date).get_standard(),
+        "recommendation.service": lambda: RecommendationService(person_card, date).get_recommendation(),
+        "recommendation.get_recommendation": lambda: get_recommendation(person_card, date),
+        "mealplan.get_meal_plan": lambda: MealPlanService(person_card, date).get_meal_plan(),
+        "view.current": get_view("current"),
+        "view.standard": get_view("standard"),
+        "view.summary": get_view("summary"),
+        "view.recommendation": get_view("recommendation"),
+        "view.mealplan": get_view("mealplan"),
+    }
+
+
+def run_benchmarks(
+    sizes: Iterable[int] = CATALOG_SIZES,
+    persons: int = 20,
+    days: int = 30,
+    repeat: int = 20,
+    seed: int = 0,
+    progress: Optional[Callable] = None,
+) -> dict:
+    """
+    Замеры на синтетических каталогах возрастающего размера с общей историей пользователей
+    """
+    sizes = sorted(sizes)
+    create_catalog(sizes[0], seed)
+    person_cards = create_persons(persons, days, seed)
+    person_card = PersonCard.objects.select_related("person").get(pk=person_cards[0].pk)
+
+    results = {}
+    for size in sizes:
+        create_catalog(size, seed)
+        results[str(size)] = {}
+        for name, func in get_cases(person_card).items():
+            results[str(size)][name] = measure(func, repeat)
+            if progress:
+                progress(size, name, results[str(size)][name])
+    return {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "persons": persons,
+            "days": days,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Регрессии относительно базовой линии: рост медианного времени больше threshold раз или рост числа запросов.
+    Время первого вызова - единичный замер, поэтому сравнивается только число его запросов
+    """
+    regressions = []
+    for size, cases in results["results"].items():
+        for name, current in cases.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if (
+                current["warm_ms"] > previous["warm_ms"] * threshold
+                and current["warm_ms"] - previous["warm_ms"] > REGRESSION_MIN_MS
+            ):
+                regressions.append(f"{size} {name}: warm_ms {previous['warm_ms']} -> {current['warm_ms']}")
+            for metric in ("cold_queries", "warm_queries"):
+                if current[metric] > previous[metric]:
+                    regressions.append(f"{size} {name}: {metric} {previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    """
+    Чтение базовой линии из JSON
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, results: dict) -> None:
+    """
+    Запись результатов замеров в JSON
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+        file.write("\n")
@@ -0,0 +1,150 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+from django.utils import timezone
+
+from bood_account.models import Person
+from bood_app.models import Eating, Measurement, PersonCard, Product, ProductCategory, ProductWeight
+from bood_app.services.catalog import bump_catalog_version
+from bood_app.services.daily_intake import rebuild_daily_intake
+from bood_app.utils.nutrients import get_proteins_density
+from bood_app.utils.text import get_search_title
+
+BATCH_SIZE = 5000
+
+# Белки, жиры, углеводы и вода на 100 г для типичного продукта категории
+CATEGORY_PROFILES = {
+    "Овощи": (1.5, 0.3, 6.0, 90.0),
+    "Фрукты": (0.7, 0.3, 12.0, 85.0),
+    "Мясо": (20.0, 12.0, 0.0, 65.0),
+    "Рыба": (19.0, 6.0, 0.0, 72.0),
+    "Молочные продукты": (5.0, 4.0, 5.0, 85.0),
+    "Крупы": (11.0, 2.0, 70.0, 12.0),
+    "Хлеб": (8.0, 3.0, 48.0, 36.0),
+    "Орехи": (18.0, 52.0, 15.0, 5.0),
+    "Сладости": (5.0, 25.0, 60.0, 5.0),
+    "Масла": (0.0, 99.0, 0.0, 0.0),
+}
+
+
+def get_categories() -> list:
+    """
+    Категории синтетического каталога
+    """
+    return [ProductCategory.objects.get_or_create(title=title)[0] for title in CATEGORY_PROFILES]
+
+
+def get_proportions(nutrients: np.ndarray) -> np.ndarray:
+    """
+    Пропорции БЖУ относительно наименьшего ненулевого значения
+    """
+    positive = np.where(nutrients > 0, nutrients, np.inf)
+    minimum = positive.min(axis=1, keepdims=True)
+    minimum[np.isinf(minimum)] = 1.0
+    return np.round(nutrients / minimum, 2)
+
+
+def create_catalog(size: int, seed: int = 0) -> int:
+    """
+    Дополнение каталога синтетическими продуктами до указанного размера
+    """
+    start = Product.objects.count()
+    if start >= size:
+        return 0
+    rng = np.random.default_rng(seed + start)
+    categories = get_categories()
+    profiles = np.array(list(CATEGORY_PROFILES.values()))
+    count = size - start
+
+    category_index = rng.integers(0, len(categories), count)
+    noise = rng.lognormal(0.0, 0.35, (count, 4))
+    values = profiles[category_index] * noise / 100
+    values[:, :3] = np.round(values[:, :3], 3)
+    values[:, 3] = np.round(np.minimum(values[:, 3], 1 - values[:, :3].sum(axis=1)).clip(0), 3)
+    calories = np.round(values[:, 0] * 4 + values[:, 1] * 9 + values[:, 2] * 4, 2)
+    proportions = get_proportions(values[:, :3])
+
+    titles = [f"{categories[category].title} #{start + number + 1}" for number, category in enumerate(category_index)]
+    products = [
+        Product(
+            title=titles[number],
+            search_title=get_search_title(titles[number]),
+            proteins=values[number, 0],
+            fats=values[number, 1],
+            carbohydrates=values[number, 2],
+            water=values[number, 3],
+            calories=calories[number],
+            proteins_proportion=proportions[number, 0],
+            fats_proportion=proportions[number, 1],
+            carbohydrates_proportion=proportions[number, 2],
+            proteins_density=get_proteins_density(values[number, 0], calories[number]),
+            category=categories[category],
+        )
+        for number, category in enumerate(category_index.tolist())
+    ]
+    Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+    bump_catalog_version("product")
+    return count
+
+
+def create_persons(
+    count: int, days: int, seed: int = 0, date: Optional[datetime.date] = None, eatings_per_day: int = 4
+) -> list:
+    """
+    Синтетические пользователи с замерами и историей приемов пищи за days дней
+    """
+    rng = np.random.default_rng(seed)
+    date = date or timezone.localdate()
+    categories = get_categories()
+    product_ids = np.array(Product.objects.order_by("id").values_list("id", flat=True))
+    start = Person.objects.count()
+
+    person_cards = []
+    for number in range(count):
+        gender = "male" if number % 2 == 0 else "female"
+        person = Person.objects.create_user(email=f"benchmark{start + number}@bood.local", password=None)
+        person_card = PersonCard.objects.create(
+            height=int(rng.integers(155, 195)),
+            age=int(rng.integers(18, 70)),
+            gender=gender,
+            activity=str(rng.choice(["1.2", "1.375", "1.55", "1.7"])),
+            person=person,
+        )
+        person_card.exclude_category.set([categories[int(rng.integers(0, len(categories)))]])
+        Measurement.objects.create(
+            weight=float(rng.uniform(50, 110)),
+            chest=float(rng.uniform(80, 120)),
+            waist=float(rng.uniform(60, 110)),
+            hips=float(rng.uniform(80, 120)),
+            hand=float(rng.uniform(14, 22)),
+            local_date=date - datetime.timedelta(days=days),
+            person_card=person_card,
+        )
+        person_cards.append(person_card)
+
+    # Текущий день заполнен частично, как при запросе рекомендации в середине дня
+    now = timezone.now()
+    product_weights = []
+    eatings = []
+    for person_card in person_cards:
+        for day in range(days):
+            local_date = date - datetime.timedelta(days=day)
+            portion = (15, 50) if day == 0 else (30, 150)
+            for _ in range(eatings_per_day):
+                product_weight = ProductWeight(
+                    product_id=int(rng.choice(product_ids)), weight=int(rng.integers(*portion))
+                )
+                product_weights.append(product_weight)
+                eatings.append(
+                    Eating(
+                        product_weight=product_weight,
+                        person_card=person_card,
+                        datetime_add=now - datetime.timedelta(days=day),
+                        local_date=local_date,
+                    )
+                )
+    ProductWeight.objects.bulk_create(product_weights, batch_size=BATCH_SIZE)
+    Eating.objects.bulk_create(eatings, batch_size=BATCH_SIZE)
+    rebuild_daily_intake([person_card.pk for person_card in person_cards])
+    return person_cards
@@ -1,9 +1,96 @@
-from rest_framework.filters import SearchFilter
+import math
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
+from bood_app.services.fuzzy import fuzzy_search_products
+from bood_app.services.search import search_products
 
 
 class TitleSearchFilter(SearchFilter):
     search_description = "Search by title."
 
 
+class ProductSearchFilter(TitleSearchFilter):
+    search_description = "Search by title (Russian word forms, ranked by relevance)."
+    fuzzy_param = "fuzzy"
+    fuzzy_description = "Typo-tolerant search, results are ranked by edit distance."
+
+    def filter_queryset(self, request, queryset, view):
+        query = " ".join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        if request.query_params.get(self.fuzzy_param, "").lower() in ("1", "true"):
+            return fuzzy_search_products(queryset, query)
+        return search_products(queryset, query)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.fuzzy_param,
+                "required": False,
+                "in": "query",
+                "description": self.fuzzy_description,
+                "schema": {"type": "boolean"},
+            }
+        ]
+
+
+class NutrientRangeFilter(BaseFilterBackend):
+    range_description = "{bound} bound of {title}."
+    # Параметр запроса, поле модели и множитель значения поля (калории хранятся на грамм)
+    ranges = {
+        "proteins": ("proteins_proportion", 1, "proteins proportion"),
+        "fats": ("fats_proportion", 1, "fats proportion"),
+        "carbohydrates": ("carbohydrates_proportion", 1, "carbohydrates proportion"),
+        "calories_per_100": ("calories", 100, "calories per 100 g"),
+    }
+    bounds = (("min", "gte", "Lower"), ("max", "lte", "Upper"))
+
+    def get_value(self, param: str, value: str) -> float:
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValidationError({"status": 400, "error": f"Invalid {param} format"})
+        if not math.isfinite(number):
+            raise ValidationError({"status": 400, "error": f"Invalid {param} format"})
+        return number
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = {}
+        for name, (field, scale, _) in self.ranges.items():
+            for bound, lookup, _ in self.bounds:
+                param = f"{name}_{bound}"
+                value = request.query_params.get(param, "")
+                if value:
+                    conditions[f"{field}__{lookup}"] = self.get_value(param, value) / scale
+        if not conditions:
+            return queryset
+        return queryset.filter(**conditions)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": f"{name}_{bound}",
+                "required": False,
+                "in": "query",
+                "description": self.range_description.format(bound=description, title=title),
+                "schema": {"type": "number"},
+            }
+            for name, (_, _, title) in self.ranges.items()
+            for bound, _, description in self.bounds
+        ]
+
+
+class ProductOrderingFilter(OrderingFilter):
+    ordering_description = "Sort by nutrient value or density, e.g. -proteins_density."
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*ordering, "id")
+
+
 class DateSearchFilter(SearchFilter):
     search_description = "Search by date."
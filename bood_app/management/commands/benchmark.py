@@ -0,0 +1,69 @@
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from bood_app.benchmarks.runner import (
+    CATALOG_SIZES,
+    REGRESSION_THRESHOLD,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = "Замеры расчета КБЖУ и рекомендаций на синтетических каталогах во временной базе данных"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=list(CATALOG_SIZES), help="Размеры синтетических каталогов"
+        )
+        parser.add_argument("--persons", type=int, default=20, help="Число синтетических пользователей")
+        parser.add_argument("--days", type=int, default=30, help="Длина истории приемов пищи в днях")
+        parser.add_argument("--repeat", type=int, default=20, help="Число повторных вызовов каждой операции")
+        parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора данных")
+        parser.add_argument("--output", help="Файл для записи результатов (новая базовая линия)")
+        parser.add_argument("--baseline", help="Файл базовой линии для сравнения")
+        parser.add_argument(
+            "--threshold", type=float, default=REGRESSION_THRESHOLD, help="Допустимый рост времени, во сколько раз"
+        )
+
+    def handle(self, *args, **options) -> None:
+        baseline = load_baseline(options["baseline"]) if options["baseline"] else None
+
+        def progress(size: int, name: str, result: dict) -> None:
+            self.stdout.write(
+                f"{size:>7} {name:<36} cold {result['cold_ms']:>9.2f} ms / {result['cold_queries']:>3} q"
+                f"  warm {result['warm_ms']:>9.2f} ms / {result['warm_queries']:>3} q"
+            )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Снимки и матрицы временной базы не смешиваются с файлами рабочего каталога
+            with tempfile.TemporaryDirectory() as directory, override_settings(CATALOG_SNAPSHOT_DIR=directory):
+                results = run_benchmarks(
+                    options["sizes"],
+                    persons=options["persons"],
+                    days=options["days"],
+                    repeat=options["repeat"],
+                    seed=options["seed"],
+                    progress=progress,
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options["output"]:
+            save_baseline(options["output"], results)
+            self.stdout.write(self.style.SUCCESS(f"Results saved to {options['output']}"))
+        if baseline is not None:
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(regression))
+                raise CommandError(f"Regressions against {options['baseline']}: {len(regressions)}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bood_app.services.catalog_import import CATALOG_BATCH_SIZE, CatalogImport
+
+
+class Command(BaseCommand):
+    help = "Потоковая загрузка и обновление каталога продуктов из JSON (product_db.json) пачками"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="Файл каталога")
+        parser.add_argument(
+            "--batch-size", type=int, default=CATALOG_BATCH_SIZE, help="Число продуктов в одной транзакции"
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["batch_size"] < 1:
+            raise CommandError("Batch size must be positive")
+
+        started = time.perf_counter()
+
+        def progress(catalog_import: CatalogImport) -> None:
+            if options["verbosity"] > 1:
+                rate = catalog_import.processed / max(time.perf_counter() - started, 1e-9)
+                self.stdout.write(f"{catalog_import.processed} products, {rate:.0f} rows/s")
+
+        catalog_import = CatalogImport(options["batch_size"])
+        try:
+            with open(options["path"], encoding="utf-8") as file:
+                catalog_import.run(file, progress)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Catalog import failed: {error}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {catalog_import.created} products, updated {catalog_import.updated}, "
+                f"unchanged {catalog_import.unchanged} "
+                f"in {elapsed:.1f} s ({catalog_import.processed / max(elapsed, 1e-9):.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,34 @@
+import datetime
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from bood_app.services.precompute import precompute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Предварительный расчет рекомендаций для всех активных пользователей"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--date", type=datetime.date.fromisoformat, help="Дата расчета, по умолчанию текущая дата пользователя"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1, help="Число процессов, 0 - без пула процессов"
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Число карточек в одной задаче")
+
+    def handle(self, *args, **options) -> None:
+        started = time.monotonic()
+
+        def progress(done: int, total: int) -> None:
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0.0
+            self.stdout.write(f"Recommendations: {done}/{total} ({rate:.1f} cards/sec)")
+
+        count = precompute_recommendations(
+            options["date"], workers=options["workers"], chunk_size=options["chunk_size"], progress=progress
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Recommendations precomputed: {count} cards in {elapsed:.1f} sec"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from bood_app.services.daily_intake import rebuild_daily_intake
+
+
+class Command(BaseCommand):
+    help = "Пересчет дневных итогов КБЖУ по истории приемов пищи"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--person-card", type=int, nargs="+", dest="person_card_ids", help="Id карточек пользователей"
+        )
+
+    def handle(self, *args, **options) -> None:
+        count = rebuild_daily_intake(options["person_card_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Daily intake rebuilt: {count} days"))
@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-18 16:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0002_alter_personcard_target"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyIntake",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(verbose_name="Дата")),
+                ("calories", models.FloatField(default=0.0, verbose_name="Калории")),
+                ("proteins", models.FloatField(default=0.0, verbose_name="Белки")),
+                ("fats", models.FloatField(default=0.0, verbose_name="Жиры")),
+                ("carbohydrates", models.FloatField(default=0.0, verbose_name="Углеводы")),
+                ("water", models.FloatField(default=0.0, verbose_name="Вода")),
+                (
+                    "person_card",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_intake",
+                        to="bood_app.personcard",
+                        verbose_name="Карточка пользователя",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Дневной итог",
+                "verbose_name_plural": "Дневные итоги",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyintake",
+            constraint=models.UniqueConstraint(fields=("person_card", "date"), name="unique_daily_intake"),
+        ),
+    ]
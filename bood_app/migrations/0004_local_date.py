@@ -0,0 +1,85 @@
+# Generated by Django 5.0 on 2026-10-18 17:10
+
+import zoneinfo
+
+import django.utils.timezone
+from django.db import migrations, models
+
+import bood_app.utils.validators
+
+
+def set_local_date(apps, schema_editor) -> None:
+    """
+    Заполнение даты пользователя для существующих приемов пищи и замеров
+    """
+    PersonCard = apps.get_model("bood_app", "PersonCard")
+    time_zones = {
+        pk: zoneinfo.ZoneInfo(time_zone) for pk, time_zone in PersonCard.objects.values_list("id", "time_zone")
+    }
+    for model_name in ("Eating", "Measurement"):
+        model = apps.get_model("bood_app", model_name)
+        objects = []
+        for obj in model.objects.only("id", "datetime_add", "person_card_id").iterator(chunk_size=2000):
+            obj.local_date = django.utils.timezone.localdate(obj.datetime_add, time_zones[obj.person_card_id])
+            objects.append(obj)
+        model.objects.bulk_update(objects, ["local_date"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0003_dailyintake"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="personcard",
+            name="time_zone",
+            field=models.CharField(
+                default="Asia/Irkutsk",
+                max_length=63,
+                validators=[bood_app.utils.validators.validate_timezone],
+                verbose_name="Часовой пояс",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eating",
+            name="datetime_add",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name="Дата и время"),
+        ),
+        migrations.AlterField(
+            model_name="measurement",
+            name="datetime_add",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name="Дата и время замера"
+            ),
+        ),
+        migrations.AddField(
+            model_name="eating",
+            name="local_date",
+            field=models.DateField(editable=False, null=True, verbose_name="Дата пользователя"),
+        ),
+        migrations.AddField(
+            model_name="measurement",
+            name="local_date",
+            field=models.DateField(editable=False, null=True, verbose_name="Дата замера пользователя"),
+        ),
+        migrations.RunPython(set_local_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="eating",
+            name="local_date",
+            field=models.DateField(editable=False, verbose_name="Дата пользователя"),
+        ),
+        migrations.AlterField(
+            model_name="measurement",
+            name="local_date",
+            field=models.DateField(editable=False, verbose_name="Дата замера пользователя"),
+        ),
+        migrations.AddIndex(
+            model_name="eating",
+            index=models.Index(fields=["person_card", "local_date"], name="eating_person_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="measurement",
+            index=models.Index(fields=["person_card", "local_date"], name="measurement_person_date_idx"),
+        ),
+    ]
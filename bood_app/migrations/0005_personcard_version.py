@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0004_local_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="personcard",
+            name="version",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Версия"),
+        ),
+    ]
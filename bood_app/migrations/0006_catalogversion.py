@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0005_personcard_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=64, unique=True, verbose_name="Справочник")),
+                ("version", models.PositiveIntegerField(default=0, verbose_name="Версия")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Обновлен")),
+            ],
+            options={
+                "verbose_name": "Версия справочника",
+                "verbose_name_plural": "Версии справочников",
+            },
+        ),
+    ]
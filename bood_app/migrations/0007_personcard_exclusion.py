@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0006_catalogversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="personcard",
+            name="exclusion",
+            field=models.BinaryField(blank=True, null=True, verbose_name="Исключенные продукты (битовая карта)"),
+        ),
+        migrations.AddField(
+            model_name="personcard",
+            name="exclusion_version",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Версия исключений"),
+        ),
+        migrations.AddField(
+            model_name="personcard",
+            name="exclusion_catalog_version",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Версия каталога исключений"),
+        ),
+    ]
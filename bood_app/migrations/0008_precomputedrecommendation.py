@@ -0,0 +1,56 @@
+# Generated by Django 5.0 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0007_personcard_exclusion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PrecomputedRecommendation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(verbose_name="Дата")),
+                ("fingerprint", models.CharField(max_length=40, verbose_name="Отпечаток входных данных")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("include", "Включить"),
+                            ("exclude", "Исключить"),
+                            ("none", "Нет рекомендаций"),
+                            ("error", "Ошибка"),
+                        ],
+                        max_length=7,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("products", models.JSONField(blank=True, default=list, verbose_name="Продукты")),
+                ("error", models.CharField(blank=True, default="", max_length=255, verbose_name="Ошибка")),
+                ("datetime_add", models.DateTimeField(auto_now=True, verbose_name="Дата и время расчета")),
+                (
+                    "person_card",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="precomputed_recommendation",
+                        to="bood_app.personcard",
+                        verbose_name="Карточка пользователя",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Предрассчитанная рекомендация",
+                "verbose_name_plural": "Предрассчитанные рекомендации",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="precomputedrecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("person_card", "date"), name="unique_precomputed_recommendation"
+            ),
+        ),
+    ]
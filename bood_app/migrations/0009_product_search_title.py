@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+from bood_app.services.search import get_search_backend
+from bood_app.utils.text import get_search_title
+
+
+def set_search_title(apps, schema_editor) -> None:
+    """
+    Заполнение поисковой строки для существующих продуктов
+    """
+    Product = apps.get_model("bood_app", "Product")
+    products = []
+    for product in Product.objects.only("id", "title").iterator(chunk_size=2000):
+        product.search_title = get_search_title(product.title)
+        products.append(product)
+    Product.objects.bulk_update(products, ["search_title"], batch_size=2000)
+
+
+def install_search_index(apps, schema_editor) -> None:
+    """
+    Полнотекстовый индекс по поисковой строке (FTS5 в SQLite, триграммы в PostgreSQL)
+    """
+    get_search_backend(schema_editor.connection).install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor) -> None:
+    get_search_backend(schema_editor.connection).uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0008_precomputedrecommendation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_title",
+            field=models.CharField(blank=True, default="", editable=False, max_length=255, verbose_name="Поиск"),
+        ),
+        migrations.RunPython(set_search_title, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
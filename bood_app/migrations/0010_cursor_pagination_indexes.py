@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0009_product_search_title"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="eating",
+            index=models.Index(fields=["person_card", "datetime_add", "id"], name="eating_person_added_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="measurement",
+            index=models.Index(fields=["person_card", "datetime_add", "id"], name="measurement_person_added_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["person_card", "is_active", "id"], name="recipe_person_active_idx"),
+        ),
+    ]
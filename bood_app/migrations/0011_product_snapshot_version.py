@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0010_cursor_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedProduct",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("product_id", models.BigIntegerField(verbose_name="Продукт")),
+                ("version", models.PositiveIntegerField(db_index=True, verbose_name="Версия каталога удаления")),
+            ],
+            options={
+                "verbose_name": "Удаленный продукт",
+                "verbose_name_plural": "Удаленные продукты",
+            },
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="version",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, editable=False, verbose_name="Версия каталога изменения"
+            ),
+        ),
+    ]
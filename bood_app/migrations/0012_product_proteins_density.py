@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-19 00:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_proteins_density(apps, schema_editor) -> None:
+    """
+    Заполнение плотности белка для существующих продуктов
+    """
+    Product = apps.get_model("bood_app", "Product")
+    Product.objects.filter(proteins__gt=0, calories__gt=0).update(proteins_density=F("proteins") / F("calories"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0011_product_snapshot_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="proteins_density",
+            field=models.FloatField(default=0.0, editable=False, verbose_name="Белки на калорию"),
+        ),
+        migrations.RunPython(set_proteins_density, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=[
+                    "-proteins_density",
+                    "id",
+                    "calories",
+                    "proteins_proportion",
+                    "fats_proportion",
+                    "carbohydrates_proportion",
+                ],
+                name="product_density_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["calories", "id"], name="product_calories_idx"),
+        ),
+    ]
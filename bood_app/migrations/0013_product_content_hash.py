@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0012_product_proteins_density"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=40, verbose_name="Хэш записи источника каталога"
+            ),
+        ),
+    ]
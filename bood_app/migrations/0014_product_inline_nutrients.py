@@ -0,0 +1,199 @@
+# Generated by Django 5.0 on 2026-10-19 02:10
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Поле продукта, модель и поле прежней таблицы
+NUTRIENT_FIELDS = (
+    ("vitamin_a", "Vitamin", "a"),
+    ("vitamin_b1", "Vitamin", "b1"),
+    ("vitamin_b2", "Vitamin", "b2"),
+    ("vitamin_b3", "Vitamin", "b3"),
+    ("vitamin_e", "Vitamin", "e"),
+    ("vitamin_c", "Vitamin", "c"),
+    ("iron", "MicroElement", "iron"),
+    ("calcium", "MicroElement", "calcium"),
+    ("sodium", "MicroElement", "sodium"),
+    ("potassium", "MicroElement", "potassium"),
+    ("phosphorus", "MicroElement", "phosphorus"),
+)
+RELATED_FIELDS = {"Vitamin": "vitamins", "MicroElement": "microelements"}
+RESTORE_BATCH_SIZE = 1000
+
+
+def move_nutrients(apps, schema_editor) -> None:
+    """
+    Перенос витаминов и микроэлементов в строки продуктов одним UPDATE
+    """
+    Product = apps.get_model("bood_app", "Product")
+    values = {}
+    for field, model_name, old_field in NUTRIENT_FIELDS:
+        rows = apps.get_model("bood_app", model_name).objects.filter(pk=OuterRef(f"{RELATED_FIELDS[model_name]}_id"))
+        values[field] = Coalesce(Subquery(rows.values(old_field)[:1]), Value(0.0))
+    Product.objects.update(**values)
+
+
+def restore_nutrients(apps, schema_editor) -> None:
+    """
+    Обратный перенос: отдельные строки витаминов и микроэлементов для каждого продукта
+    """
+    Product = apps.get_model("bood_app", "Product")
+    ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), RESTORE_BATCH_SIZE):
+        products = list(Product.objects.filter(pk__in=ids[start : start + RESTORE_BATCH_SIZE]))
+        for model_name, related_field in RELATED_FIELDS.items():
+            model = apps.get_model("bood_app", model_name)
+            fields = [(field, old_field) for field, name, old_field in NUTRIENT_FIELDS if name == model_name]
+            rows = model.objects.bulk_create(
+                [model(**{old_field: getattr(product, field) for field, old_field in fields}) for product in products]
+            )
+            for product, row in zip(products, rows):
+                setattr(product, related_field, row)
+        Product.objects.bulk_update(products, list(RELATED_FIELDS.values()))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0013_product_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_a",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин А",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_b1",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин В1",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_b2",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин В2",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_b3",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин В3",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_e",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин Е",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="vitamin_c",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Витамин С",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="iron",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Железо",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="calcium",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Кальций",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="sodium",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Натрий",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="potassium",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Калий",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="phosphorus",
+            field=models.FloatField(
+                blank=True,
+                default=0.0,
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.0)],
+                verbose_name="Фосфор",
+            ),
+        ),
+        migrations.RunPython(move_nutrients, restore_nutrients),
+        migrations.RemoveField(
+            model_name="product",
+            name="vitamins",
+        ),
+        migrations.RemoveField(
+            model_name="product",
+            name="microelements",
+        ),
+        migrations.DeleteModel(
+            name="Vitamin",
+        ),
+        migrations.DeleteModel(
+            name="MicroElement",
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bood_app", "0014_product_inline_nutrients"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="eating",
+            name="eating_person_added_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="measurement",
+            name="measurement_person_added_idx",
+        ),
+        migrations.AddIndex(
+            model_name="eating",
+            index=models.Index(fields=["person_card", "id"], name="eating_person_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="measurement",
+            index=models.Index(fields=["person_card", "id"], name="measurement_person_id_idx"),
+        ),
+    ]
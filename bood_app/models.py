@@ -1,8 +1,17 @@
+import datetime
+import zoneinfo
+from typing import Optional
+
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.utils import timezone
 
 from bood_account.models import Person
-from bood_app.utils.resources import GENDER_TYPE, TARGET_TYPE, ACTIVITY_TYPE
+from bood_app.utils.resources import GENDER_TYPE, TARGET_TYPE, ACTIVITY_TYPE, RECOMMENDATION_KIND
+from bood_app.utils.nutrients import get_proteins_density
+from bood_app.utils.text import get_search_title
+from bood_app.utils.validators import validate_timezone
 
 
 class PersonCard(models.Model):
@@ -16,7 +25,16 @@ class PersonCard(models.Model):
     target = models.CharField(blank=True, default="", max_length=4, choices=TARGET_TYPE, verbose_name="Цель")
     activity = models.CharField(max_length=5, choices=ACTIVITY_TYPE, verbose_name="Активность")
     image = models.URLField(blank=True, default="", verbose_name="Фото")
+    time_zone = models.CharField(
+        max_length=63, default=settings.TIME_ZONE, validators=[validate_timezone], verbose_name="Часовой пояс"
+    )
     person = models.OneToOneField(Person, on_delete=models.CASCADE, verbose_name="Пользователь")
+    version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Версия")
+    exclusion = models.BinaryField(null=True, blank=True, verbose_name="Исключенные продукты (битовая карта)")
+    exclusion_version = models.PositiveIntegerField(default=0, editable=False, verbose_name="Версия исключений")
+    exclusion_catalog_version = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Версия каталога исключений"
+    )
     femaletype = models.ManyToManyField("FemaleType", related_name="personcard", blank=True, verbose_name="Тип женщины")
     exclude_products = models.ManyToManyField(
         "Product", related_name="personcard", blank=True, verbose_name="Исключенные продукты"
@@ -35,6 +53,20 @@ class PersonCard(models.Model):
     def __str__(self) -> str:
         return str(self.person.email)
 
+    def save(self, *args, **kwargs) -> None:
+        # Версию увеличивает сигнал одним UPDATE, значение в памяти могло устареть и не записывается
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields if not field.primary_key and field.name != "version"
+            ]
+        super().save(*args, **kwargs)
+
+    def get_local_date(self, value: Optional[datetime.datetime] = None) -> datetime.date:
+        """
+        Дата в часовом поясе пользователя
+        """
+        return timezone.localdate(value or timezone.now(), zoneinfo.ZoneInfo(self.time_zone))
+
 
 class FemaleType(models.Model):
     title = models.CharField(max_length=255, unique=True, verbose_name="Название")
@@ -57,7 +89,8 @@ class Measurement(models.Model):
     )
     hips = models.FloatField(validators=[MinValueValidator(30.0), MaxValueValidator(300.0)], verbose_name="Объем бедер")
     hand = models.FloatField(validators=[MinValueValidator(10.0), MaxValueValidator(30.0)], verbose_name="Объем кисти")
-    datetime_add = models.DateTimeField(auto_now_add=True, verbose_name="Дата и время замера")
+    datetime_add = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Дата и время замера")
+    local_date = models.DateField(editable=False, verbose_name="Дата замера пользователя")
     person_card = models.ForeignKey(
         "PersonCard", on_delete=models.CASCADE, related_name="measurements", verbose_name="Карточка пользователя"
     )
@@ -65,13 +98,61 @@ class Measurement(models.Model):
     class Meta:
         verbose_name = "Замер"
         verbose_name_plural = "Замеры"
+        indexes = [
+            models.Index(fields=["person_card", "local_date"], name="measurement_person_date_idx"),
+            models.Index(fields=["person_card", "id"], name="measurement_person_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return str(self.person_card.person.email)
 
+    def save(self, *args, **kwargs) -> None:
+        if self.local_date is None:
+            self.local_date = self.person_card.get_local_date(self.datetime_add)
+        super().save(*args, **kwargs)
+
+
+# Прежнее имя поля витаминов и микроэлементов и поле продукта
+VITAMIN_FIELDS = {
+    "a": "vitamin_a",
+    "b1": "vitamin_b1",
+    "b2": "vitamin_b2",
+    "b3": "vitamin_b3",
+    "e": "vitamin_e",
+    "c": "vitamin_c",
+}
+MICROELEMENT_FIELDS = {
+    "iron": "iron",
+    "calcium": "calcium",
+    "sodium": "sodium",
+    "potassium": "potassium",
+    "phosphorus": "phosphorus",
+}
+
+
+class NutrientGroup:
+    """
+    Доступ к витаминам или микроэлементам продукта по прежним именам полей, например product.vitamins.a
+    """
+
+    def __init__(self, product: "Product", fields: dict):
+        object.__setattr__(self, "product", product)
+        object.__setattr__(self, "fields", fields)
+
+    def __getattr__(self, name: str):
+        if name not in self.fields:
+            raise AttributeError(name)
+        return getattr(self.product, self.fields[name])
+
+    def __setattr__(self, name: str, value) -> None:
+        if name not in self.fields:
+            raise AttributeError(name)
+        setattr(self.product, self.fields[name], value)
+
 
 class Product(models.Model):
     title = models.CharField(max_length=255, unique=True, db_index=True, verbose_name="Название")
+    search_title = models.CharField(max_length=255, blank=True, default="", editable=False, verbose_name="Поиск")
     proteins = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Белки"
     )
@@ -96,6 +177,7 @@ class Product(models.Model):
     carbohydrates_proportion = models.FloatField(
         null=True, blank=True, default=0.0, db_index=True, validators=[MinValueValidator(0.0)], verbose_name="У"
     )
+    proteins_density = models.FloatField(default=0.0, editable=False, verbose_name="Белки на калорию")
     category = models.ForeignKey(
         "ProductCategory",
         on_delete=models.PROTECT,
@@ -105,50 +187,24 @@ class Product(models.Model):
         blank=True,
         db_index=True,
     )
-    vitamins = models.OneToOneField(
-        "Vitamin", on_delete=models.CASCADE, null=True, related_name="product", verbose_name="Витамины"
-    )
-    microelements = models.OneToOneField(
-        "MicroElement", on_delete=models.CASCADE, null=True, related_name="product", verbose_name="Микроэлементы"
-    )
-
-    class Meta:
-        verbose_name = "Продукт"
-        verbose_name_plural = "Продукты"
-
-    def __str__(self) -> str:
-        return str(self.title)
-
-
-class Vitamin(models.Model):
-    a = models.FloatField(
+    vitamin_a = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин А"
     )
-    b1 = models.FloatField(
+    vitamin_b1 = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин В1"
     )
-    b2 = models.FloatField(
+    vitamin_b2 = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин В2"
     )
-    b3 = models.FloatField(
+    vitamin_b3 = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин В3"
     )
-    e = models.FloatField(
+    vitamin_e = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин Е"
     )
-    c = models.FloatField(
+    vitamin_c = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Витамин С"
     )
-
-    class Meta:
-        verbose_name = "Витамин"
-        verbose_name_plural = "Витамины"
-
-    def __str__(self) -> str:
-        return f"Витамины для: {self.product.title}"
-
-
-class MicroElement(models.Model):
     iron = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Железо"
     )
@@ -164,13 +220,55 @@ class MicroElement(models.Model):
     phosphorus = models.FloatField(
         null=True, blank=True, default=0.0, validators=[MinValueValidator(0.0)], verbose_name="Фосфор"
     )
+    version = models.PositiveIntegerField(
+        default=0, db_index=True, editable=False, verbose_name="Версия каталога изменения"
+    )
+    content_hash = models.CharField(
+        max_length=40, blank=True, default="", editable=False, verbose_name="Хэш записи источника каталога"
+    )
 
     class Meta:
-        verbose_name = "Микроэлемент"
-        verbose_name_plural = "Микроэлементы"
+        verbose_name = "Продукт"
+        verbose_name_plural = "Продукты"
+        indexes = [
+            # Сортировка по плотности белка с фильтрами по диапазонам без чтения строк таблицы
+            models.Index(
+                fields=[
+                    "-proteins_density",
+                    "id",
+                    "calories",
+                    "proteins_proportion",
+                    "fats_proportion",
+                    "carbohydrates_proportion",
+                ],
+                name="product_density_idx",
+            ),
+            models.Index(fields=["calories", "id"], name="product_calories_idx"),
+        ]
 
     def __str__(self) -> str:
-        return f"Микроэлементы для: {self.product.title}"
+        return str(self.title)
+
+    @property
+    def vitamins(self) -> NutrientGroup:
+        return NutrientGroup(self, VITAMIN_FIELDS)
+
+    @property
+    def microelements(self) -> NutrientGroup:
+        return NutrientGroup(self, MICROELEMENT_FIELDS)
+
+    def save(self, *args, **kwargs) -> None:
+        self.search_title = get_search_title(self.title)
+        self.proteins_density = get_proteins_density(self.proteins, self.calories)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "title" in update_fields:
+                update_fields.add("search_title")
+            if update_fields & {"proteins", "calories"}:
+                update_fields.add("proteins_density")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
 
 
 class ProductCategory(models.Model):
@@ -187,7 +285,8 @@ class ProductCategory(models.Model):
 
 
 class Eating(models.Model):
-    datetime_add = models.DateTimeField(auto_now_add=True, verbose_name="Дата и время")
+    datetime_add = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Дата и время")
+    local_date = models.DateField(editable=False, verbose_name="Дата пользователя")
     product_weight = models.OneToOneField(
         "ProductWeight",
         on_delete=models.CASCADE,
@@ -209,10 +308,19 @@ class Eating(models.Model):
     class Meta:
         verbose_name = "Прием пищи"
         verbose_name_plural = "Приемы пищи"
+        indexes = [
+            models.Index(fields=["person_card", "local_date"], name="eating_person_date_idx"),
+            models.Index(fields=["person_card", "id"], name="eating_person_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return str(self.person_card.person.email)
 
+    def save(self, *args, **kwargs) -> None:
+        if self.local_date is None:
+            self.local_date = self.person_card.get_local_date(self.datetime_add)
+        super().save(*args, **kwargs)
+
 
 class FAQ(models.Model):
     question = models.CharField(max_length=255, verbose_name="Вопрос")
@@ -255,6 +363,9 @@ class Recipe(models.Model):
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(fields=["person_card", "is_active", "id"], name="recipe_person_active_idx"),
+        ]
 
     def __str__(self) -> str:
         return str(self.title)
@@ -269,3 +380,75 @@ class Water(models.Model):
 
     def __str__(self) -> str:
         return str(self.weight)
+
+
+class DailyIntake(models.Model):
+    person_card = models.ForeignKey(
+        "PersonCard", on_delete=models.CASCADE, related_name="daily_intake", verbose_name="Карточка пользователя"
+    )
+    date = models.DateField(verbose_name="Дата")
+    calories = models.FloatField(default=0.0, verbose_name="Калории")
+    proteins = models.FloatField(default=0.0, verbose_name="Белки")
+    fats = models.FloatField(default=0.0, verbose_name="Жиры")
+    carbohydrates = models.FloatField(default=0.0, verbose_name="Углеводы")
+    water = models.FloatField(default=0.0, verbose_name="Вода")
+
+    class Meta:
+        verbose_name = "Дневной итог"
+        verbose_name_plural = "Дневные итоги"
+        constraints = [
+            models.UniqueConstraint(fields=["person_card", "date"], name="unique_daily_intake"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.person_card_id}: {self.date}"
+
+
+class CatalogVersion(models.Model):
+    name = models.CharField(max_length=64, unique=True, verbose_name="Справочник")
+    version = models.PositiveIntegerField(default=0, verbose_name="Версия")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
+
+    class Meta:
+        verbose_name = "Версия справочника"
+        verbose_name_plural = "Версии справочников"
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.version}"
+
+
+class PrecomputedRecommendation(models.Model):
+    person_card = models.ForeignKey(
+        "PersonCard",
+        on_delete=models.CASCADE,
+        related_name="precomputed_recommendation",
+        verbose_name="Карточка пользователя",
+    )
+    date = models.DateField(verbose_name="Дата")
+    fingerprint = models.CharField(max_length=40, verbose_name="Отпечаток входных данных")
+    kind = models.CharField(max_length=7, choices=RECOMMENDATION_KIND, verbose_name="Тип")
+    products = models.JSONField(default=list, blank=True, verbose_name="Продукты")
+    error = models.CharField(max_length=255, blank=True, default="", verbose_name="Ошибка")
+    datetime_add = models.DateTimeField(auto_now=True, verbose_name="Дата и время расчета")
+
+    class Meta:
+        verbose_name = "Предрассчитанная рекомендация"
+        verbose_name_plural = "Предрассчитанные рекомендации"
+        constraints = [
+            models.UniqueConstraint(fields=["person_card", "date"], name="unique_precomputed_recommendation"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.person_card_id}: {self.date}"
+
+
+class DeletedProduct(models.Model):
+    product_id = models.BigIntegerField(verbose_name="Продукт")
+    version = models.PositiveIntegerField(db_index=True, verbose_name="Версия каталога удаления")
+
+    class Meta:
+        verbose_name = "Удаленный продукт"
+        verbose_name_plural = "Удаленные продукты"
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.version}"
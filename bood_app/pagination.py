@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация от новых записей к старым по id.
+    Курсор хранит только значение первого поля сортировки, поэтому сортировка идет по уникальному id:
+    страница выбирается по индексу без COUNT и OFFSET, новые записи не сдвигают уже выданные страницы
+    """
+
+    ordering = ("-id",)
+    page_size_query_param = "limit"
+    max_page_size = 1000
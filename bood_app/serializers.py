@@ -1,6 +1,5 @@
-from datetime import datetime
-
-from django.utils import timezone
+from django.conf import settings
+from django.db import transaction
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
@@ -20,8 +19,12 @@ from .models import (
     ProductCategory,
     FAQ,
 )
-from .services.kbjy import KBJYService, RecommendationService
+from .services.kbjy import KBJYService, get_history, get_recommendation
+from .services.autocomplete import AUTOCOMPLETE_MAX_SIZE, AUTOCOMPLETE_SIZE, get_autocomplete_index
+from .services.mealplan import MEALPLAN_MAX_SIZE, MEALPLAN_SIZE, MealPlanService
+from .utils.date_validation import get_date, get_date_range
 from .utils.eating_validation import eating_validation
+from .utils.size_validation import get_size
 from .utils.person_card_validation import get_person_card
 
 
@@ -32,6 +35,21 @@ class ProductSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "title", "proteins", "fats", "carbohydrates", "calories", "water")
 
 
+class ProductTitleSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+
+
+class ProductAutocompleteSerializer(serializers.Serializer):
+    products = ProductTitleSerializer(many=True, read_only=True)
+
+    def __init__(self, context=None, instance=None, *args, **kwargs):
+        super().__init__(instance, *args, **kwargs)
+        if context:
+            size = get_size(context["size"], AUTOCOMPLETE_SIZE, AUTOCOMPLETE_MAX_SIZE)
+            self.instance = {"products": get_autocomplete_index().search(context["q"] or "", size)}
+
+
 class ProductCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductCategory
@@ -39,6 +57,42 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "title", "description", "image")
 
 
+class VitaminSerializer(serializers.Serializer):
+    a = serializers.FloatField(read_only=True)
+    b1 = serializers.FloatField(read_only=True)
+    b2 = serializers.FloatField(read_only=True)
+    b3 = serializers.FloatField(read_only=True)
+    e = serializers.FloatField(read_only=True)
+    c = serializers.FloatField(read_only=True)
+
+
+class MicroElementSerializer(serializers.Serializer):
+    iron = serializers.FloatField(read_only=True)
+    calcium = serializers.FloatField(read_only=True)
+    sodium = serializers.FloatField(read_only=True)
+    potassium = serializers.FloatField(read_only=True)
+    phosphorus = serializers.FloatField(read_only=True)
+
+
+class ProductDetailSerializer(serializers.ModelSerializer):
+    category = ProductCategorySerializer(read_only=True)
+    vitamins = VitaminSerializer(read_only=True)
+    microelements = MicroElementSerializer(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ProductSerializer.Meta.fields + (
+            "proteins_proportion",
+            "fats_proportion",
+            "carbohydrates_proportion",
+            "proteins_density",
+            "category",
+            "vitamins",
+            "microelements",
+        )
+        read_only_fields = fields
+
+
 class FAQSerializer(serializers.ModelSerializer):
     class Meta:
         model = FAQ
@@ -49,8 +103,8 @@ class FAQSerializer(serializers.ModelSerializer):
 class MeasurementSerializer(serializers.ModelSerializer):
     class Meta:
         model = Measurement
-        fields = ("id", "weight", "chest", "waist", "hips", "hand", "datetime_add", "person_card")
-        read_only_fields = ("id", "datetime_add", "person_card")
+        fields = ("id", "weight", "chest", "waist", "hips", "hand", "datetime_add", "local_date", "person_card")
+        read_only_fields = ("id", "datetime_add", "local_date", "person_card")
 
     def create(self, validated_data):
         user_id = self.context["user_id"]
@@ -79,6 +133,7 @@ class PostPersonCardSerializer(serializers.ModelSerializer):
             "target",
             "activity",
             "image",
+            "time_zone",
             "person",
             "femaletype",
             "exclude_products",
@@ -94,6 +149,7 @@ class PostPersonCardSerializer(serializers.ModelSerializer):
         target = validated_data.pop("target", "")
         activity = validated_data.pop("activity")
         image = validated_data.pop("image", "")
+        time_zone = validated_data.pop("time_zone", settings.TIME_ZONE)
         femaletype = validated_data.pop("femaletype", None)
         exclude_products = validated_data.pop("exclude_products", None)
         exclude_category = validated_data.pop("exclude_category", None)
@@ -112,6 +168,7 @@ class PostPersonCardSerializer(serializers.ModelSerializer):
             target=target,
             activity=activity,
             image=image,
+            time_zone=time_zone,
         )
 
         person_card.femaletype.set(femaletype)
@@ -216,9 +273,10 @@ class PostEatingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Eating
-        fields = ("id", "datetime_add", "product_weight", "recipe", "water")
-        read_only_fields = ("id", "datetime_add")
+        fields = ("id", "datetime_add", "local_date", "product_weight", "recipe", "water")
+        read_only_fields = ("id", "datetime_add", "local_date")
 
+    @transaction.atomic
     def create(self, validated_data) -> dict:
         product_weight = validated_data.pop("product_weight", None)
         recipe = validated_data.pop("recipe", None)
@@ -240,6 +298,7 @@ class PostEatingSerializer(serializers.ModelSerializer):
         eating.save()
         return eating
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         product_weight_data = validated_data.get("product_weight", None)
         recipe = validated_data.get("recipe", None)
@@ -285,17 +344,10 @@ class CalculateSerializer(serializers.Serializer):
         super().__init__(instance, *args, **kwargs)
         if context:
             user_id = context["user_id"]
-            str_date = context["date"]
-            if str_date:
-                try:
-                    date = datetime.strptime(str_date, "%Y-%m-%d")
-                except ValueError:
-                    raise ValidationError({"status": 400, "error": "Invalid date format"})
-            else:
-                date = timezone.now().date()
+            person_card = get_person_card(user_id)
+            date = get_date(context["date"], person_card.get_local_date())
 
             calculate_type = context["calculate_type"]
-            person_card = get_person_card(user_id)
             person = KBJYService(person_card, date)
             imt = person.get_imt()
             if calculate_type == "standard":
@@ -342,6 +394,54 @@ class CalculateSerializer(serializers.Serializer):
         return self.instance["water"]
 
 
+class NutrientsSerializer(serializers.Serializer):
+    calories = serializers.IntegerField()
+    proteins = serializers.IntegerField()
+    fats = serializers.IntegerField()
+    carbohydrates = serializers.IntegerField()
+    water = serializers.IntegerField()
+
+
+class ImtSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    value = serializers.FloatField()
+
+
+class SummarySerializer(serializers.Serializer):
+    imt = ImtSerializer(read_only=True)
+    standard = NutrientsSerializer(read_only=True)
+    current = NutrientsSerializer(read_only=True)
+    remaining = NutrientsSerializer(read_only=True)
+    percent = NutrientsSerializer(read_only=True)
+
+    def __init__(self, context=None, instance=None, *args, **kwargs):
+        super().__init__(instance, *args, **kwargs)
+        if context:
+            user_id = context["user_id"]
+            person_card = get_person_card(user_id)
+            date = get_date(context["date"], person_card.get_local_date())
+            self.instance = KBJYService(person_card, date).get_summary()
+
+
+class HistoryDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    current = NutrientsSerializer()
+    standard = NutrientsSerializer(allow_null=True)
+    measurement = MeasurementSerializer(allow_null=True)
+
+
+class HistorySerializer(serializers.Serializer):
+    days = HistoryDaySerializer(many=True, read_only=True)
+
+    def __init__(self, context=None, instance=None, *args, **kwargs):
+        super().__init__(instance, *args, **kwargs)
+        if context:
+            user_id = context["user_id"]
+            person_card = get_person_card(user_id)
+            date_from, date_to = get_date_range(context["date_from"], context["date_to"], person_card.get_local_date())
+            self.instance = {"days": get_history(person_card, date_from, date_to)}
+
+
 class RecommendationSerializer(serializers.Serializer):
     products = serializers.SerializerMethodField()
 
@@ -350,8 +450,7 @@ class RecommendationSerializer(serializers.Serializer):
         if context:
             user_id = context["user_id"]
             person_card = get_person_card(user_id)
-            person = RecommendationService(person_card)
-            self.recommendation = person.get_recommendation()
+            self.recommendation = get_recommendation(person_card)
 
     @extend_schema_field(ProductSerializer)
     def get_products(self, obj):
@@ -359,3 +458,30 @@ class RecommendationSerializer(serializers.Serializer):
             return {"include": ProductSerializer(self.recommendation["include"], many=True).data}
         if self.recommendation.get("exclude", None):
             return {"exclude": ProductSerializer(self.recommendation["exclude"], many=True).data}
+
+
+class MealPlanNutrientsSerializer(serializers.Serializer):
+    calories = serializers.IntegerField()
+    proteins = serializers.IntegerField()
+    fats = serializers.IntegerField()
+    carbohydrates = serializers.IntegerField()
+
+
+class MealPlanProductSerializer(serializers.Serializer):
+    product = ProductSerializer()
+    weight = serializers.IntegerField()
+
+
+class MealPlanSerializer(serializers.Serializer):
+    remaining = MealPlanNutrientsSerializer(read_only=True)
+    planned = MealPlanNutrientsSerializer(read_only=True)
+    products = MealPlanProductSerializer(many=True, read_only=True)
+
+    def __init__(self, context=None, instance=None, *args, **kwargs):
+        super().__init__(instance, *args, **kwargs)
+        if context:
+            user_id = context["user_id"]
+            person_card = get_person_card(user_id)
+            date = get_date(context["date"], person_card.get_local_date())
+            size = get_size(context["size"], MEALPLAN_SIZE, MEALPLAN_MAX_SIZE)
+            self.instance = MealPlanService(person_card, date).get_meal_plan(size)
@@ -0,0 +1,200 @@
+import re
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from django.db import connections
+from django.db.models import Count
+
+from bood_app.models import Product
+from bood_app.services.catalog import get_catalog_version
+from bood_app.utils.text import normalize_text
+
+AUTOCOMPLETE_SIZE = 10
+AUTOCOMPLETE_MAX_SIZE = 50
+# Как часто проверяется версия каталога и как долго живет популярность продуктов, в секундах
+AUTOCOMPLETE_CHECK_INTERVAL = 5.0
+AUTOCOMPLETE_MAX_AGE = 3600.0
+# Однобайтовая кодировка вдвое сокращает буфер для кириллицы, символы вне нее заменяются на "?"
+AUTOCOMPLETE_ENCODING = "cp1251"
+WORD = re.compile(r"\w+")
+
+
+def get_fold_table() -> bytes:
+    """
+    Таблица приведения байтов кодировки индекса к нормализованному виду
+    """
+    table = bytearray(range(256))
+    for byte in range(256):
+        char = bytes([byte]).decode(AUTOCOMPLETE_ENCODING, errors="ignore")
+        folded = normalize_text(char).encode(AUTOCOMPLETE_ENCODING, errors="ignore")
+        if char and len(folded) == 1:
+            table[byte] = folded[0]
+    return bytes(table)
+
+
+FOLD_TABLE = get_fold_table()
+
+
+def encode_key(text: str) -> bytes:
+    """
+    Нормализованная строка в кодировке индекса
+    """
+    return text.encode(AUTOCOMPLETE_ENCODING, errors="replace").translate(FOLD_TABLE)
+
+
+class AutocompleteIndex:
+    """
+    Отсортированный массив начал слов названий продуктов для поиска по префиксу.
+    Названия хранятся одним буфером в однобайтовой кодировке, ключом служит смещение в нем,
+    регистр приводится при сравнении
+    """
+
+    def __init__(self, version: int, rows: list):
+        self.version = version
+        self.built_at = time.monotonic()
+        id_type = np.int32 if not rows or max(row[0] for row in rows) < 2**31 else np.int64
+        self.ids = np.array([row[0] for row in rows], dtype=id_type)
+        self.popularity = np.array([row[2] for row in rows], dtype=np.int32)
+
+        # Названия вне однобайтовой кодировки дополнительно хранятся как есть, их в каталоге единицы
+        self.unencoded_titles = {}
+        titles = []
+        for number, row in enumerate(rows):
+            try:
+                titles.append(row[1].encode(AUTOCOMPLETE_ENCODING))
+            except UnicodeEncodeError:
+                self.unencoded_titles[number] = row[1]
+                titles.append(row[1].encode(AUTOCOMPLETE_ENCODING, errors="replace"))
+        self.titles = b"\0".join(titles) + b"\0"
+        self.offsets = np.cumsum([0] + [len(title) + 1 for title in titles], dtype=np.int32)
+
+        entries = [
+            (self.get_key(int(self.offsets[number]) + match.start()), int(self.offsets[number]) + match.start(), number)
+            for number, title in enumerate(titles)
+            for match in WORD.finditer(title.translate(FOLD_TABLE).decode(AUTOCOMPLETE_ENCODING))
+        ]
+        entries.sort()
+        self.positions = np.array([entry[1] for entry in entries], dtype=np.int32)
+        self.entry_titles = np.array([entry[2] for entry in entries], dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Объем памяти индекса в байтах
+        """
+        arrays = (self.ids, self.popularity, self.offsets, self.positions, self.entry_titles)
+        return len(self.titles) + sum(array.nbytes for array in arrays)
+
+    def get_key(self, position: int, size: Optional[int] = None) -> bytes:
+        end = self.titles.index(b"\0", position) if size is None else position + size
+        return self.titles[position:end].translate(FOLD_TABLE)
+
+    def get_title(self, number: int) -> str:
+        if number in self.unencoded_titles:
+            return self.unencoded_titles[number]
+        return self.titles[self.offsets[number] : self.offsets[number + 1] - 1].decode(AUTOCOMPLETE_ENCODING)
+
+    def bound(self, prefix: bytes, upper: bool) -> int:
+        """
+        Бинарный поиск первой записи, начало которой больше (upper) или не меньше префикса
+        """
+        low, high = 0, len(self.positions)
+        while low < high:
+            middle = (low + high) // 2
+            key = self.get_key(int(self.positions[middle]), len(prefix))
+            if key < prefix or (upper and key == prefix):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def search(self, query: str, size: int = AUTOCOMPLETE_SIZE) -> list:
+        """
+        Самые популярные продукты, одно из слов названия которых начинается с query
+        """
+        prefix = encode_key(query.lstrip())
+        if not prefix.strip():
+            return []
+        titles = self.entry_titles[self.bound(prefix, False) : self.bound(prefix, True)]
+        if titles.size > 2 * size:
+            top = np.unique(titles[np.argpartition(-self.popularity[titles], 2 * size - 1)[: 2 * size]])
+            titles = top if top.size >= size else np.unique(titles)
+        else:
+            titles = np.unique(titles)
+        titles = titles[np.lexsort((self.ids[titles], -self.popularity[titles]))][:size]
+        return [{"id": int(self.ids[number]), "title": self.get_title(number)} for number in titles.tolist()]
+
+
+def build_autocomplete_index(version: Optional[int] = None) -> AutocompleteIndex:
+    """
+    Загрузка названий и популярности продуктов (число использований в приемах пищи и рецептах)
+    """
+    if version is None:
+        version = get_catalog_version("product")
+    rows = list(Product.objects.annotate(popularity=Count("product_weight")).values_list("id", "title", "popularity"))
+    return AutocompleteIndex(version, rows)
+
+
+autocomplete_index: Optional[AutocompleteIndex] = None
+autocomplete_checked_at = 0.0
+autocomplete_lock = threading.Lock()
+autocomplete_thread: Optional[threading.Thread] = None
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """
+    Индекс процесса. Строится при первом обращении, затем обновляется в фоне при изменении версии каталога
+    """
+    global autocomplete_index, autocomplete_checked_at
+    index = autocomplete_index
+    if index is None:
+        with autocomplete_lock:
+            if autocomplete_index is None:
+                autocomplete_index = build_autocomplete_index()
+                autocomplete_checked_at = time.monotonic()
+            return autocomplete_index
+    if time.monotonic() - autocomplete_checked_at > AUTOCOMPLETE_CHECK_INTERVAL:
+        start_autocomplete_refresh()
+    return index
+
+
+def start_autocomplete_refresh() -> None:
+    """
+    Запуск фоновой проверки версии каталога, не более одной одновременно
+    """
+    global autocomplete_checked_at, autocomplete_thread
+    with autocomplete_lock:
+        if autocomplete_thread is not None and autocomplete_thread.is_alive():
+            return
+        autocomplete_checked_at = time.monotonic()
+        autocomplete_thread = threading.Thread(target=refresh_in_background, name="autocomplete-refresh", daemon=True)
+        autocomplete_thread.start()
+
+
+def refresh_in_background() -> None:
+    try:
+        refresh_autocomplete_index()
+    finally:
+        connections.close_all()
+
+
+def refresh_autocomplete_index() -> None:
+    """
+    Перестроение индекса при изменении версии каталога или устаревании популярности
+    """
+    global autocomplete_index
+    version = get_catalog_version("product")
+    index = autocomplete_index
+    if index is None or index.version != version or time.monotonic() - index.built_at > AUTOCOMPLETE_MAX_AGE:
+        autocomplete_index = build_autocomplete_index(version)
+
+
+def clear_autocomplete_index() -> None:
+    """
+    Сброс индекса процесса
+    """
+    global autocomplete_index, autocomplete_checked_at
+    autocomplete_index = None
+    autocomplete_checked_at = 0.0
@@ -0,0 +1,103 @@
+import logging
+from typing import Any, Callable
+
+from django.core.cache import cache
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Хук инструментирования: отправляется при каждом обращении к кэшу (name, key, hit)
+cache_accessed = Signal()
+
+
+class CacheCounter:
+    """
+    Счетчик попаданий и промахов кэша
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        self.hits += 1
+
+    def miss(self) -> None:
+        self.misses += 1
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "hits": self.hits, "misses": self.misses, "ratio": round(self.ratio, 3)}
+
+
+counters = {}
+
+
+def get_counter(name: str) -> CacheCounter:
+    """
+    Получение счетчика кэша по имени
+    """
+    if name not in counters:
+        counters[name] = CacheCounter(name)
+    return counters[name]
+
+
+def get_cache_stats() -> list:
+    """
+    Статистика всех счетчиков кэша процесса
+    """
+    return [counter.as_dict() for counter in counters.values()]
+
+
+def get_or_set(name: str, key: str, default: Callable[[], Any], timeout: int = CACHE_TIMEOUT) -> Any:
+    """
+    Получение значения из кэша или его расчет с сохранением
+    """
+    value = cache.get(key)
+    if value is not None:
+        count_access(name, key, True)
+        return value
+    count_access(name, key, False)
+    value = default()
+    cache.set(key, value, timeout)
+    return value
+
+
+def get_or_set_versioned(
+    name: str, key: str, fingerprint: Any, default: Callable[[], Any], timeout: int = CACHE_TIMEOUT
+) -> Any:
+    """
+    Получение значения из кэша, если отпечаток входных данных не изменился, иначе расчет с перезаписью
+    """
+    cached = cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        count_access(name, key, True)
+        return cached[1]
+    count_access(name, key, False)
+    value = default()
+    cache.set(key, (fingerprint, value), timeout)
+    return value
+
+
+def count_access(name: str, key: str, hit: bool) -> None:
+    """
+    Учет обращения к кэшу
+    """
+    counter = get_counter(name)
+    if hit:
+        counter.hit()
+    else:
+        counter.miss()
+        logger.debug("Cache miss %s: %s", name, key)
+    cache_accessed.send(sender=CacheCounter, name=name, key=key, hit=hit)
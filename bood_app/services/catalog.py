@@ -0,0 +1,92 @@
+import datetime
+from typing import Callable, Optional
+
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from bood_app.models import CatalogVersion, FAQ, FemaleType, Product, ProductCategory
+
+CATALOG_NAMES = {
+    Product: "product",
+    ProductCategory: "category",
+    FAQ: "faq",
+    FemaleType: "femaletype",
+}
+
+
+def get_catalog_version(name: str) -> int:
+    """
+    Текущая версия справочника
+    """
+    return CatalogVersion.objects.filter(name=name).values_list("version", flat=True).first() or 0
+
+
+def bump_catalog_version(name: str) -> int:
+    """
+    Увеличение версии справочника после его изменения, возвращается новая версия
+    """
+    updated = CatalogVersion.objects.filter(name=name).update(version=F("version") + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogVersion.objects.get_or_create(name=name, defaults={"version": 1})
+    return get_catalog_version(name)
+
+
+def get_catalog_state(name: str) -> tuple:
+    """
+    Версия справочника и время его последнего изменения
+    """
+    return CatalogVersion.objects.filter(name=name).values_list("version", "updated_at").first() or (0, None)
+
+
+def get_catalog_key(state: tuple) -> str:
+    """
+    Ключ файлов и кэша версии справочника. Время изменения различает версии с одним номером
+    после пересоздания базы данных
+    """
+    version, updated_at = state
+    stamp = int(updated_at.timestamp() * 1000000) if updated_at else 0
+    return f"{version}-{stamp}"
+
+
+def is_older_catalog_key(key: str, state: tuple) -> bool:
+    """
+    Ключ файлов прошлой версии этого же справочника: и номер версии, и время изменения раньше текущих.
+    Файлы другой базы данных с тем же каталогом на диске так не удаляются
+    """
+    version, _, stamp = key.partition("-")
+    current_version, current_stamp = (int(part) for part in get_catalog_key(state).split("-"))
+    if not (version.isdigit() and stamp.isdigit()):
+        return False
+    return int(version) < current_version and int(stamp) < current_stamp
+
+
+def catalog_condition(name: str, nested: tuple = (), is_nested: Optional[Callable] = None) -> Callable:
+    """
+    Условный GET по версии справочника: ETag, Last-Modified и ответ 304 до обращения к выборке.
+    Ответ с вложенными справочниками nested зависит и от их версий, is_nested(request) решает,
+    вложены ли они в ответ на этот запрос
+    """
+
+    def get_state(request, catalog: str) -> tuple:
+        states = getattr(request, "catalog_states", None)
+        if states is None:
+            states = request.catalog_states = {}
+        if catalog not in states:
+            states[catalog] = get_catalog_state(catalog)
+        return states[catalog]
+
+    def get_names(request) -> tuple:
+        if nested and (is_nested is None or is_nested(request)):
+            return (name, *nested)
+        return (name,)
+
+    def get_etag(request, *args, **kwargs) -> str:
+        return ".".join(f"{catalog}-{get_state(request, catalog)[0]}" for catalog in get_names(request))
+
+    def get_last_modified(request, *args, **kwargs) -> Optional[datetime.datetime]:
+        updated = [get_state(request, catalog)[1] for catalog in get_names(request)]
+        updated = [value for value in updated if value is not None]
+        return max(updated) if updated else None
+
+    return condition(etag_func=get_etag, last_modified_func=get_last_modified)
@@ -0,0 +1,223 @@
+import hashlib
+import json
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from django.db import connection, transaction
+from django.db.models import Model
+
+from bood_app.models import Product, ProductCategory
+from bood_app.services.catalog import bump_catalog_version, get_catalog_state, get_catalog_version
+from bood_app.services.daily_intake import invalidate_product_daily_intake
+from bood_app.services.product_index import write_product_matrix
+from bood_app.services.snapshot import build_catalog_snapshot
+from bood_app.utils.json_stream import iter_json_object
+from bood_app.utils.nutrients import get_proteins_density
+from bood_app.utils.text import get_search_title
+
+CATALOG_BATCH_SIZE = 1000
+# Увеличивается при изменении разбора записей, чтобы следующая загрузка обновила все продукты
+CATALOG_RECORD_FORMAT = 1
+# Поле модели и ключ раздела записи каталога
+NUTRIENT_KEYS = {
+    "proteins": "Белки",
+    "fats": "Жиры",
+    "carbohydrates": "Углеводы",
+    "calories": "Калорийность",
+    "water": "Вода",
+}
+PROPORTION_KEYS = {
+    "proteins_proportion": "Б",
+    "fats_proportion": "Ж",
+    "carbohydrates_proportion": "У",
+}
+VITAMIN_KEYS = {
+    "vitamin_a": "Витамин А, РЭ",
+    "vitamin_b1": "Витамин В1, тиамин",
+    "vitamin_b2": "Витамин В2, рибофлавин",
+    "vitamin_b3": "Витамин РР, НЭ",
+    "vitamin_e": "Витамин Е, альфа токоферол, ТЭ",
+    "vitamin_c": "Витамин C, аскорбиновая",
+}
+MICROELEMENT_KEYS = {
+    "iron": "Железо, Fe",
+    "calcium": "Кальций, Ca",
+    "sodium": "Натрий, Na",
+    "potassium": "Калий, K",
+    "phosphorus": "Фосфор, P",
+}
+PRODUCT_FIELDS = (
+    "title",
+    "search_title",
+    *NUTRIENT_KEYS,
+    *PROPORTION_KEYS,
+    "proteins_density",
+    *VITAMIN_KEYS,
+    *MICROELEMENT_KEYS,
+    "category",
+    "version",
+    "content_hash",
+)
+# Название и поисковая строка при обновлении не меняются, иначе триггер FTS переписывает индекс
+UPDATE_PRODUCT_FIELDS = tuple(field for field in PRODUCT_FIELDS if field not in ("title", "search_title"))
+
+
+def get_values(record: dict, section: str, keys: dict) -> dict:
+    """
+    Значения раздела записи каталога по полям модели, отсутствующие равны нулю
+    """
+    values = record.get(section) or {}
+    return {field: values.get(key, 0.0) for field, key in keys.items()}
+
+
+def get_record_hash(record: dict) -> str:
+    """
+    Хэш записи каталога, не зависящий от порядка ключей
+    """
+    content = json.dumps([CATALOG_RECORD_FORMAT, record], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def insert_rows(model: type[Model], fields: Iterable[str], rows: list) -> None:
+    """
+    Вставка строк одним executemany без сборки объектов моделей
+    """
+    fields = [model._meta.get_field(name) for name in fields]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+
+
+def update_rows(model: type[Model], fields: Iterable[str], rows: list) -> None:
+    """
+    Обновление строк одним executemany, последнее значение строки - id
+    """
+    fields = [model._meta.get_field(name) for name in fields]
+    table = connection.ops.quote_name(model._meta.db_table)
+    assignments = ", ".join(f"{connection.ops.quote_name(field.column)} = %s" for field in fields)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.executemany(f"UPDATE {table} SET {assignments} WHERE {pk} = %s", rows)
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class CatalogImport:
+    """
+    Загрузка продуктов из JSON каталога вида {название: запись} пачками в отдельных транзакциях.
+    Известные продукты сравниваются по хэшу записи, обновляются только изменившиеся,
+    версия каталога увеличивается один раз и только если что-то изменилось
+    """
+
+    def __init__(self, batch_size: int = CATALOG_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.categories = dict(ProductCategory.objects.values_list("title", "id"))
+        # Продукты помечаются версией, которую каталог получит после загрузки
+        self.version = get_catalog_version("product") + 1
+        self.created = 0
+        self.updated = 0
+        self.updated_ids = []
+        self.unchanged = 0
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.updated + self.unchanged
+
+    def get_category_id(self, title: Optional[str]) -> Optional[int]:
+        if not title:
+            return None
+        if title not in self.categories:
+            self.categories[title] = ProductCategory.objects.get_or_create(title=title)[0].pk
+        return self.categories[title]
+
+    def run(self, file: TextIO, progress: Optional[Callable] = None) -> None:
+        try:
+            for batch in iter_batches(iter_json_object(file), self.batch_size):
+                with transaction.atomic():
+                    self.import_batch(batch)
+                if progress:
+                    progress(self)
+        finally:
+            # Пачки до ошибки в файле уже сохранены, их продукты должны попасть в новую версию каталога
+            if self.created or self.updated:
+                self.finish()
+
+    def import_batch(self, batch: list) -> None:
+        """
+        Вставка новых и обновление изменившихся продуктов пачки.
+        При повторе названия в пачке используется последняя запись
+        """
+        records = dict(batch)
+        existing = {
+            title: (pk, content_hash)
+            for title, pk, content_hash in Product.objects.filter(title__in=list(records)).values_list(
+                "title", "id", "content_hash"
+            )
+        }
+        created, updated = [], []
+        for title, record in records.items():
+            content_hash = get_record_hash(record)
+            if title not in existing:
+                created.append((title, record, content_hash))
+            elif existing[title][1] != content_hash:
+                updated.append((title, record, content_hash))
+            else:
+                self.unchanged += 1
+        if created:
+            self.create_products(created)
+        if updated:
+            self.update_products(updated, existing)
+
+    def get_product_row(self, record: dict, content_hash: str) -> tuple:
+        """
+        Значения полей продукта без названия и поисковой строки в порядке UPDATE_PRODUCT_FIELDS
+        """
+        nutrients = get_values(record, "КБЖУ+Вода", NUTRIENT_KEYS)
+        proportions = get_values(record, "БЖУ", PROPORTION_KEYS)
+        return (
+            *nutrients.values(),
+            *proportions.values(),
+            get_proteins_density(nutrients["proteins"], nutrients["calories"]),
+            *get_values(record, "Витамины", VITAMIN_KEYS).values(),
+            *get_values(record, "Микроэлементы", MICROELEMENT_KEYS).values(),
+            self.get_category_id(record.get("Категория")),
+            self.version,
+            content_hash,
+        )
+
+    def create_products(self, products: list) -> None:
+        rows = [
+            (title, get_search_title(title), *self.get_product_row(record, content_hash))
+            for title, record, content_hash in products
+        ]
+        insert_rows(Product, PRODUCT_FIELDS, rows)
+        self.created += len(rows)
+
+    def update_products(self, products: list, existing: dict) -> None:
+        rows = [
+            (*self.get_product_row(record, content_hash), existing[title][0])
+            for title, record, content_hash in products
+        ]
+        update_rows(Product, UPDATE_PRODUCT_FIELDS, rows)
+        self.updated += len(rows)
+        self.updated_ids.extend(row[-1] for row in rows)
+
+    def finish(self) -> None:
+        """
+        Одна новая версия каталога на загрузку и заранее собранные снимок и матрица нутриентов
+        """
+        version = bump_catalog_version("product")
+        if version != self.version:
+            # Версию каталога за время загрузки увеличило другое изменение
+            Product.objects.filter(version=self.version).update(version=version)
+            self.version = version
+        # Обновление идет запросами UPDATE без сигналов, поэтому дневные итоги сбрасываются здесь
+        invalidate_product_daily_intake(self.updated_ids)
+        build_catalog_snapshot()
+        write_product_matrix(get_catalog_state("product"))
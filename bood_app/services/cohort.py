@@ -0,0 +1,113 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from bood_app.models import Measurement
+
+IMT_TYPES = np.array(["Эктоморф", "Мезоморф", "Эндоморф"])
+
+
+def get_cohort_values(person_cards: QuerySet, date: datetime.date) -> list:
+    """
+    Загрузка полей карточек и последних замеров на дату одним запросом
+    """
+    measurements = Measurement.objects.filter(person_card_id=OuterRef("pk"), local_date__lte=date).order_by(
+        "-local_date", "-datetime_add"
+    )
+    return list(
+        person_cards.annotate(
+            weight=Subquery(measurements.values("weight")[:1]),
+            hand=Subquery(measurements.values("hand")[:1]),
+        )
+        .filter(weight__isnull=False)
+        .values_list("id", "gender", "age", "height", "activity", "weight", "hand")
+    )
+
+
+def get_body_type(male: np.ndarray, hand: np.ndarray) -> np.ndarray:
+    """
+    Индекс типа телосложения: 0 - эктоморф, 1 - мезоморф, 2 - эндоморф
+    """
+    low = np.where(male, 18, 16)
+    high = np.where(male, 20, 17)
+    return np.select([hand < low, hand <= high], [0, 1], default=2)
+
+
+def compute_standards(person_cards: QuerySet, date: Optional[datetime.date] = None) -> dict:
+    """
+    Пакетный расчет ИМТ и лимитов КБЖУ для набора карточек.
+    Формулы совпадают с KBJYService; карточки без замеров на дату пропускаются
+    """
+    if date is None:
+        date = timezone.localdate()
+    rows = get_cohort_values(person_cards, date)
+    if not rows:
+        return {}
+
+    ids, genders, age, height, activity, weight, hand = zip(*rows)
+    male = np.array(genders) == "male"
+    age = np.array(age, dtype=np.float64)
+    height = np.array(height, dtype=np.float64)
+    amr = np.array([float(value) for value in activity])
+    weight = np.array(weight, dtype=np.float64)
+    hand = np.array(hand, dtype=np.float64)
+
+    body_type = get_body_type(male, hand)
+    coefficients = np.where(male[:, None], [0.375, 0.39, 0.41], [0.325, 0.34, 0.355])
+    ideal_weight = height * coefficients[np.arange(len(ids)), body_type]
+
+    calories = np.where(
+        male,
+        (
+            ((10 * ideal_weight) + (6.25 * height) - (5 * age) + 5)
+            + (ideal_weight * 24)
+            + (21.3 * ideal_weight + 370)
+            + (66.5 + 13.7 * ideal_weight + 5 * height - 6.8 * age)
+        )
+        / 4,
+        (
+            ((10 * ideal_weight) + (6.25 * height) - (5 * age) - 161)
+            + (ideal_weight * 24)
+            + (21.3 * ideal_weight + 370)
+            + (447.6 + 9.2 * ideal_weight + 3.1 * height - 4.3 * age)
+        )
+        / 4,
+    )
+    standards = np.rint(
+        np.stack(
+            [
+                (calories + (calories * 0.1)) * amr,
+                calories * 0.14 / 3.8,
+                calories * 0.3 / 9.3,
+                calories * 0.56 / 4.1,
+                weight * 30,
+            ],
+            axis=1,
+        )
+    ).astype(np.int64)
+    bmi = weight / (height / 100) ** 2
+    imt_types = IMT_TYPES[body_type]
+
+    # round(x, 1) у numpy может расходиться с round() Python в последнем знаке
+    return {
+        person_card_id: {
+            "imt": {"type": imt_type, "value": round(value, 1)},
+            "standard": {
+                "calories": calories_value,
+                "proteins": proteins_value,
+                "fats": fats_value,
+                "carbohydrates": carbohydrates_value,
+                "water": water_value,
+            },
+        }
+        for person_card_id, imt_type, value, (
+            calories_value,
+            proteins_value,
+            fats_value,
+            carbohydrates_value,
+            water_value,
+        ) in zip(ids, imt_types.tolist(), bmi.tolist(), standards.tolist())
+    }
@@ -0,0 +1,62 @@
+import datetime
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from bood_app.models import DailyIntake, Eating
+from bood_app.services.kbjy import get_intake
+
+INTAKE_FIELDS = ("calories", "proteins", "fats", "carbohydrates", "water")
+# Число продуктов в одном запросе поиска затронутых дней
+PRODUCT_BATCH_SIZE = 500
+
+
+def refresh_daily_intake(person_card_id: int, date: datetime.date, create: bool = True) -> None:
+    """
+    Пересчет дневного итога пользователя за указанную дату
+    """
+    intake = get_intake(person_card_id, date)
+    if create:
+        DailyIntake.objects.update_or_create(person_card_id=person_card_id, date=date, defaults=intake)
+    else:
+        DailyIntake.objects.filter(person_card_id=person_card_id, date=date).update(**intake)
+
+
+def rebuild_daily_intake(person_card_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Полное восстановление дневных итогов по истории приемов пищи
+    """
+    eating = Eating.objects.all()
+    ledger = DailyIntake.objects.all()
+    if person_card_ids is not None:
+        eating = eating.filter(person_card_id__in=person_card_ids)
+        ledger = ledger.filter(person_card_id__in=person_card_ids)
+
+    days = eating.values_list("person_card_id", "local_date").distinct()
+
+    count = 0
+    with transaction.atomic():
+        ledger.delete()
+        for person_card_id, date in days:
+            refresh_daily_intake(person_card_id, date)
+            count += 1
+    return count
+
+
+def invalidate_product_daily_intake(product_ids: Iterable[int]) -> int:
+    """
+    Удаление дневных итогов всех пользователей за дни, когда ели продукты, после изменения их КБЖУ.
+    Итоги без строки считаются по приемам пищи при чтении, строка снова появится при следующем приеме пищи
+    """
+    product_ids = list(product_ids)
+    count = 0
+    for start in range(0, len(product_ids), PRODUCT_BATCH_SIZE):
+        batch = product_ids[start : start + PRODUCT_BATCH_SIZE]
+        eating = Eating.objects.filter(
+            Q(product_weight__product_id__in=batch) | Q(recipe__product_weight__product_id__in=batch),
+            person_card_id=OuterRef("person_card_id"),
+            local_date=OuterRef("date"),
+        )
+        count += DailyIntake.objects.filter(Exists(eating)).delete()[0]
+    return count
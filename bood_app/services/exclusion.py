@@ -0,0 +1,88 @@
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+from django.db.models import F, Q
+
+from bood_app.models import PersonCard, Product
+from bood_app.services.catalog import get_catalog_version
+
+
+class ProductIdSet:
+    """
+    Множество id продуктов в виде битовой карты
+    """
+
+    def __init__(self, bitmap: np.ndarray):
+        self.bitmap = bitmap
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "ProductIdSet":
+        ids = np.fromiter(ids, dtype=np.int64)
+        bitmap = np.zeros(int(ids.max()) + 1 if ids.size else 0, dtype=bool)
+        bitmap[ids] = True
+        return cls(bitmap)
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> "ProductIdSet":
+        return cls(np.unpackbits(np.frombuffer(zlib.decompress(value), dtype=np.uint8)).astype(bool))
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(np.packbits(self.bitmap).tobytes())
+
+    def contains(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Векторная проверка вхождения id
+        """
+        result = np.zeros(ids.shape, dtype=bool)
+        inside = ids < self.bitmap.size
+        result[inside] = self.bitmap[ids[inside]]
+        return result
+
+    @property
+    def ids(self) -> np.ndarray:
+        return np.flatnonzero(self.bitmap)
+
+    def __contains__(self, pk: int) -> bool:
+        return pk < self.bitmap.size and bool(self.bitmap[pk])
+
+    def __len__(self) -> int:
+        return int(self.bitmap.sum())
+
+
+def refresh_excluded_products(person_card: PersonCard, catalog_version: Optional[int] = None) -> ProductIdSet:
+    """
+    Пересчет исключенных продуктов пользователя: выбранные продукты, категории и продукты без категории
+    """
+    if catalog_version is None:
+        catalog_version = get_catalog_version("product")
+    ids = Product.objects.filter(
+        Q(personcard=person_card) | Q(category__personcard=person_card) | Q(category__isnull=True)
+    ).values_list("id", flat=True)
+    exclusion = ProductIdSet.from_ids(ids)
+    person_card.exclusion = exclusion.to_bytes()
+    person_card.exclusion_catalog_version = catalog_version
+    PersonCard.objects.filter(pk=person_card.pk).update(
+        exclusion=person_card.exclusion, exclusion_catalog_version=catalog_version
+    )
+    return exclusion
+
+
+def get_excluded_products(person_card: PersonCard) -> ProductIdSet:
+    """
+    Исключенные продукты пользователя, пересчитываются при изменении каталога
+    """
+    catalog_version = get_catalog_version("product")
+    if person_card.exclusion is None or person_card.exclusion_catalog_version != catalog_version:
+        return refresh_excluded_products(person_card, catalog_version)
+    return ProductIdSet.from_bytes(bytes(person_card.exclusion))
+
+
+def set_exclusion_changed(person_card_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Сброс исключений карточек, пересчет при следующем обращении
+    """
+    person_cards = PersonCard.objects.all()
+    if person_card_ids is not None:
+        person_cards = person_cards.filter(pk__in=person_card_ids)
+    person_cards.update(exclusion=None, exclusion_version=F("exclusion_version") + 1)
@@ -0,0 +1,169 @@
+import threading
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+from django.db.models import QuerySet
+
+from bood_app.models import Product
+from bood_app.services.catalog import get_catalog_version
+from bood_app.services.search import SEARCH_LIMIT, order_by_ids
+from bood_app.utils.text import WORD, normalize_text
+
+
+def get_max_distance(word: str) -> int:
+    """
+    Допустимое число опечаток в слове в зависимости от его длины
+    """
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def get_trigrams(word: str) -> set:
+    """
+    Триграммы слова с метками начала и конца
+    """
+    padded = f"^{word}$"
+    return {padded[position : position + 3] for position in range(len(padded) - 2)}
+
+
+def levenshtein(first: str, second: str, limit: int) -> int:
+    """
+    Расстояние Левенштейна, при превышении limit возвращается limit + 1
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, 1):
+        current = [row]
+        for column, second_char in enumerate(second, 1):
+            current.append(
+                min(previous[column] + 1, current[column - 1] + 1, previous[column - 1] + (first_char != second_char))
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyIndex:
+    """
+    Словарь слов названий продуктов с триграммным инвертированным индексом
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        rows = list(Product.objects.order_by("id").values_list("id", "title"))
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+
+        word_titles = defaultdict(set)
+        title_words = []
+        for number, (_, title) in enumerate(rows):
+            words = WORD.findall(normalize_text(title))
+            title_words.append(len(words))
+            for word in words:
+                word_titles[word].add(number)
+        self.title_words = np.array(title_words, dtype=np.int32)
+        self.words = sorted(word_titles)
+        self.word_numbers = {word: number for number, word in enumerate(self.words)}
+        self.word_lengths = np.array([len(word) for word in self.words], dtype=np.int32)
+
+        titles = [sorted(word_titles[word]) for word in self.words]
+        self.title_offsets = np.cumsum([0] + [len(numbers) for numbers in titles], dtype=np.int64)
+        self.title_numbers = np.array([number for numbers in titles for number in numbers], dtype=np.int32)
+
+        postings = defaultdict(list)
+        for number, word in enumerate(self.words):
+            for trigram in get_trigrams(word):
+                postings[trigram].append(number)
+        self.postings = {trigram: np.array(numbers, dtype=np.int32) for trigram, numbers in postings.items()}
+
+    def match_word(self, word: str) -> dict:
+        """
+        Номера слов словаря, отличающихся от word не более чем на допустимое число опечаток, с расстоянием
+        """
+        limit = get_max_distance(word)
+        if limit == 0:
+            number = self.word_numbers.get(word)
+            return {} if number is None else {number: 0}
+
+        trigrams = [self.postings[trigram] for trigram in get_trigrams(word) if trigram in self.postings]
+        if not trigrams:
+            return {}
+        shared = np.bincount(np.concatenate(trigrams), minlength=len(self.words))
+        # Каждая правка затрагивает не более трех триграмм
+        required = np.maximum(np.maximum(self.word_lengths, len(word)) - 3 * limit, 1)
+        candidates = np.flatnonzero((shared >= required) & (np.abs(self.word_lengths - len(word)) <= limit)).tolist()
+
+        matches = {}
+        for number in candidates:
+            distance = levenshtein(word, self.words[number], limit)
+            if distance <= limit:
+                matches[number] = distance
+        return matches
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list:
+        """
+        Id продуктов, в названии которых найдено каждое слово запроса с учетом опечаток,
+        по возрастанию суммы расстояний
+        """
+        words = WORD.findall(normalize_text(query))
+        if not words:
+            return []
+        missing = np.iinfo(np.int32).max
+        total = np.zeros(len(self.ids), dtype=np.int64)
+        found = np.ones(len(self.ids), dtype=bool)
+        for word in words:
+            distances = np.full(len(self.ids), missing, dtype=np.int64)
+            for number, distance in self.match_word(word).items():
+                titles = self.title_numbers[self.title_offsets[number] : self.title_offsets[number + 1]]
+                distances[titles] = np.minimum(distances[titles], distance)
+            found &= distances < missing
+            if not found.any():
+                return []
+            total += distances
+
+        titles = np.flatnonzero(found)
+        titles = titles[np.lexsort((self.ids[titles], self.title_words[titles], total[titles]))][:limit]
+        return self.ids[titles].tolist()
+
+
+fuzzy_index: Optional[FuzzyIndex] = None
+fuzzy_index_lock = threading.Lock()
+
+
+def get_fuzzy_index() -> FuzzyIndex:
+    """
+    Индекс процесса, перестраивается при изменении версии каталога
+    """
+    global fuzzy_index
+    version = get_catalog_version("product")
+    index = fuzzy_index
+    if index is None or index.version != version:
+        with fuzzy_index_lock:
+            index = fuzzy_index
+            if index is None or index.version != version:
+                index = FuzzyIndex(version)
+                fuzzy_index = index
+    return index
+
+
+def clear_fuzzy_index() -> None:
+    """
+    Сброс индекса процесса
+    """
+    global fuzzy_index
+    fuzzy_index = None
+
+
+def fuzzy_search_products(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Поиск продуктов по названию с опечатками
+    """
+    ids = get_fuzzy_index().search(query)
+    if not ids:
+        return queryset.none()
+    return order_by_ids(queryset, ids)
@@ -1,10 +1,30 @@
-from django.db.models import Q
-from django.utils import timezone
+import hashlib
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
 from rest_framework.exceptions import ValidationError
 
-from bood_app.models import PersonCard, Measurement, ProductWeight, Product, Water
+from bood_app.models import (
+    PersonCard,
+    Measurement,
+    ProductWeight,
+    Product,
+    Water,
+    DailyIntake,
+    Eating,
+    PrecomputedRecommendation,
+)
+from bood_app.services.caching import get_or_set, get_or_set_versioned
+from bood_app.services.catalog import get_catalog_version
+from bood_app.services.exclusion import get_excluded_products
+from bood_app.services.product_index import get_product_index
 import datetime
 
+RECOMMENDATION_SIZE = 4
+RECOMMENDATION_MAX_DISTANCE = 10.0
+
 
 def get_ideal_weight(gender: str, hand: float, height: float) -> float:
     """
@@ -33,23 +53,98 @@ def get_measurements(person_card: PersonCard, date: datetime.date) -> Measuremen
     Получение последних замеров пользователя
     """
     try:
-        measurements = Measurement.objects.filter(person_card_id=person_card.pk, datetime_add__date__lte=date).order_by(
-            "-datetime_add"
+        measurements = Measurement.objects.filter(person_card_id=person_card.pk, local_date__lte=date).order_by(
+            "-local_date", "-datetime_add"
         )[0]
         return measurements
     except IndexError:
         raise ValidationError({"status": "400", "error": "Measurements not found"})
 
 
+def get_cached_measurements(person_card: PersonCard, date: datetime.date) -> Measurement:
+    """
+    Получение последних замеров пользователя с кэшированием по версии карточки
+    """
+    key = f"kbjy:measurement:{person_card.pk}:{person_card.version}:{date.isoformat()}"
+    return get_or_set("measurement", key, lambda: get_measurements(person_card, date))
+
+
+def get_intakes(person_card_id: int, dates: Iterable[datetime.date]) -> dict:
+    """
+    Подсчет съеденного по дням двумя сгруппированными запросами, дни без приемов пищи равны нулю
+    """
+    dates = set(dates)
+    empty = {"calories": 0.0, "proteins": 0.0, "fats": 0.0, "carbohydrates": 0.0, "water": 0.0}
+    intakes = {date: dict(empty) for date in dates}
+    if not dates:
+        return intakes
+    rows = (
+        ProductWeight.objects.filter(
+            Q(eating__local_date__in=dates, eating__person_card_id=person_card_id)
+            | Q(recipe__eating__local_date__in=dates, recipe__eating__person_card_id=person_card_id)
+        )
+        .values(intake_date=Coalesce("eating__local_date", "recipe__eating__local_date"))
+        .annotate(
+            calories=Coalesce(Sum(F("product__calories") * F("weight")), 0.0),
+            proteins=Coalesce(Sum(F("product__proteins") * F("weight")), 0.0),
+            fats=Coalesce(Sum(F("product__fats") * F("weight")), 0.0),
+            carbohydrates=Coalesce(Sum(F("product__carbohydrates") * F("weight")), 0.0),
+            water=Coalesce(Sum(F("product__water") * F("weight")), 0.0),
+        )
+        .order_by()
+    )
+    for row in rows:
+        intakes[row.pop("intake_date")].update(row)
+    water = (
+        Water.objects.filter(eating__local_date__in=dates, eating__person_card_id=person_card_id)
+        .values("eating__local_date")
+        .annotate(weight=Coalesce(Sum("weight"), 0))
+        .order_by()
+    )
+    for row in water:
+        intakes[row["eating__local_date"]]["water"] += row["weight"]
+    return intakes
+
+
+def get_intake(person_card_id: int, date: datetime.date) -> dict:
+    """
+    Подсчет съеденного за день по истории приемов пищи
+    """
+    return get_intakes(person_card_id, [date])[date]
+
+
+def round_intake(intake: dict) -> dict:
+    """
+    Округление показателей КБЖУ
+    """
+    return {
+        "calories": round(intake["calories"]),
+        "proteins": round(intake["proteins"]),
+        "fats": round(intake["fats"]),
+        "carbohydrates": round(intake["carbohydrates"]),
+        "water": round(intake["water"]),
+    }
+
+
 class KBJYService:
     """
     Расчет КБЖУ
     """
 
-    def __init__(self, person_card: PersonCard, date: datetime.date = timezone.now().date()):
-        measurements = get_measurements(person_card, date)
+    def __init__(
+        self,
+        person_card: PersonCard,
+        date: Optional[datetime.date] = None,
+        measurements: Optional[Measurement] = None,
+    ):
+        if date is None:
+            date = person_card.get_local_date()
+        if measurements is None:
+            measurements = get_cached_measurements(person_card, date)
         self.date = date
         self.id = person_card.pk
+        self.version = person_card.version
+        self.measurements_id = measurements.pk
         self.gender = person_card.gender
         self.age = person_card.age
         self.weight = measurements.weight
@@ -83,6 +178,13 @@ class KBJYService:
         return {"type": imt[0], "value": round(imt[1], 1)}
 
     def get_standard(self) -> dict:
+        """
+        Лимиты КБЖУ из кэша по версии карточки и замерам
+        """
+        key = f"kbjy:standard:{self.id}:{self.version}:{self.measurements_id}"
+        return get_or_set("standard", key, self.calculate_standard)
+
+    def calculate_standard(self) -> dict:
         """
         Расчет лимитов КБЖУ в зависимости от даты
         """
@@ -120,41 +222,94 @@ class KBJYService:
         """
         Расчет текущих показателей КБЖУ в зависимости от даты
         """
-        products_list = ProductWeight.objects.filter(
-            Q(eating__datetime_add__date=self.date, eating__person_card_id=self.id)
-            | Q(recipe__eating__datetime_add__date=self.date, recipe__eating__person_card_id=self.id)
+        intake = (
+            DailyIntake.objects.filter(person_card_id=self.id, date=self.date)
+            .values("calories", "proteins", "fats", "carbohydrates", "water")
+            .first()
         )
-        water_list = sum(Water.objects.filter(eating__datetime_add__date=self.date).values_list("weight", flat=True))
-
-        calories = 0.0
-        proteins = 0.0
-        fats = 0.0
-        carbohydrates = 0.0
-        water = 0.0
-
-        for prod in products_list:
-            product = Product.objects.get(id=prod.product_id)
-            calories += product.calories * prod.weight
-            proteins += product.proteins * prod.weight
-            fats += product.fats * prod.weight
-            carbohydrates += product.carbohydrates * prod.weight
-            water += product.water * prod.weight
+        if intake is None:
+            intake = get_intake(self.id, self.date)
+        return round_intake(intake)
 
+    def get_summary(self) -> dict:
+        """
+        Сводка КБЖУ: ИМТ, норма, текущие значения, остаток и процент выполнения
+        """
+        standard = self.get_standard()
+        current = self.get_current()
+        remaining = {key: value - current[key] for key, value in standard.items()}
+        percent = {key: round(current[key] / value * 100) if value else 0 for key, value in standard.items()}
         return {
-            "calories": round(calories),
-            "proteins": round(proteins),
-            "fats": round(fats),
-            "carbohydrates": round(carbohydrates),
-            "water": round(water + water_list),
+            "imt": self.get_imt(),
+            "standard": standard,
+            "current": current,
+            "remaining": remaining,
+            "percent": percent,
         }
 
 
+def get_history(person_card: PersonCard, date_from: datetime.date, date_to: datetime.date) -> list:
+    """
+    Расчет текущих и нормативных КБЖУ по дням за период
+    """
+    intake = {
+        values.pop("date"): values
+        for values in DailyIntake.objects.filter(
+            person_card_id=person_card.pk, date__range=(date_from, date_to)
+        ).values("date", "calories", "proteins", "fats", "carbohydrates", "water")
+    }
+    eaten_days = (
+        Eating.objects.filter(person_card_id=person_card.pk, local_date__range=(date_from, date_to))
+        .values_list("local_date", flat=True)
+        .distinct()
+    )
+    # Дни без строки дневного итога (до его появления) считаются одним сгруппированным запросом
+    intake.update(get_intakes(person_card.pk, set(eaten_days) - set(intake)))
+
+    measurements = list(
+        Measurement.objects.filter(person_card_id=person_card.pk, local_date__range=(date_from, date_to)).order_by(
+            "-local_date", "-datetime_add"
+        )
+    )
+    previous = (
+        Measurement.objects.filter(person_card_id=person_card.pk, local_date__lt=date_from)
+        .order_by("-local_date", "-datetime_add")
+        .first()
+    )
+    if previous is not None:
+        measurements.append(previous)
+    standards = {}
+    empty = {"calories": 0.0, "proteins": 0.0, "fats": 0.0, "carbohydrates": 0.0, "water": 0.0}
+
+    history = []
+    date = date_from
+    while date <= date_to:
+        measurement = next((item for item in measurements if item.local_date <= date), None)
+        standard = None
+        if measurement is not None:
+            if measurement.pk not in standards:
+                standards[measurement.pk] = KBJYService(person_card, date, measurement).get_standard()
+            standard = standards[measurement.pk]
+        history.append(
+            {
+                "date": date,
+                "current": round_intake(intake.get(date, empty)),
+                "standard": standard,
+                "measurement": measurement,
+            }
+        )
+        date += datetime.timedelta(days=1)
+    return history
+
+
 class RecommendationService:
     """
     Подбор рекомендаций
     """
 
-    def __init__(self, person_card: PersonCard, date: datetime.date = timezone.now().date()):
+    def __init__(self, person_card: PersonCard, date: Optional[datetime.date] = None):
+        if date is None:
+            date = person_card.get_local_date()
         self.person_card = person_card
         kbjy_service = KBJYService(self.person_card, date)
         standard = kbjy_service.get_standard()
@@ -166,15 +321,17 @@ class RecommendationService:
         self.current_fats = current["fats"]
         self.current_carbohydrates = current["carbohydrates"]
         self.date = date
-        self.eaten_products = Product.objects.filter(
-            Q(
-                product_weight__eating__datetime_add__date=self.date,
-                product_weight__eating__person_card_id=person_card.id,
-            )
-            | Q(
-                product_weight__recipe__eating__datetime_add__date=self.date,
-                product_weight__recipe__eating__person_card_id=person_card.id,
-            )
+        self.eaten_products = list(
+            Product.objects.filter(
+                Q(
+                    product_weight__eating__local_date=self.date,
+                    product_weight__eating__person_card_id=person_card.id,
+                )
+                | Q(
+                    product_weight__recipe__eating__local_date=self.date,
+                    product_weight__recipe__eating__person_card_id=person_card.id,
+                )
+            ).values_list("id", flat=True)
         )
 
     def get_recommendation(self) -> dict:
@@ -196,28 +353,15 @@ class RecommendationService:
                 fats_proportion = round(fats / min_value, 2)
                 carbohydrates_proportion = round(carbohydrates / min_value, 2)
 
-                exclude_products_ids = Product.objects.filter(
-                    Q(personcard=self.person_card) | Q(category__personcard=self.person_card) | Q(category__isnull=True)
-                ).values_list("id", flat=True)
-
-                result = []
-                error_value = 0.1
-                end_cycle = 0
-                while len(result) < 4 and end_cycle < 100:
-                    result = Product.objects.filter(
-                        Q(
-                            proteins_proportion__gte=proteins_proportion - error_value,
-                            fats_proportion__gte=fats_proportion - error_value,
-                            carbohydrates_proportion__gte=carbohydrates_proportion - error_value,
-                        )
-                        & Q(
-                            proteins_proportion__lte=proteins_proportion + error_value,
-                            fats_proportion__lte=fats_proportion + error_value,
-                            carbohydrates_proportion__lte=carbohydrates_proportion + error_value,
-                        )
-                    ).exclude(id__in=exclude_products_ids)[:4]
-                    error_value += 0.1
-                    end_cycle += 1
+                index = get_product_index()
+                ids = index.nearest(
+                    (proteins_proportion, fats_proportion, carbohydrates_proportion),
+                    k=RECOMMENDATION_SIZE,
+                    exclude=get_excluded_products(self.person_card),
+                    max_distance=RECOMMENDATION_MAX_DISTANCE,
+                )
+                products = Product.objects.in_bulk(ids)
+                result = [products[pk] for pk in ids if pk in products]
                 return {"include": result}
             if (
                 self.current_proteins > self.standard_proteins
@@ -229,7 +373,64 @@ class RecommendationService:
                 carbohydrates = self.current_carbohydrates - self.standard_carbohydrates
                 proportion = {"proteins": proteins, "fats": fats, "carbohydrates": carbohydrates}
                 max_value = sorted(proportion.items(), key=lambda item: item[1])[-1]
-                result = [self.eaten_products.order_by(max_value[0]).last()]
-                return {"exclude": result}
+                pk = get_product_index().richest(self.eaten_products, max_value[0])
+                return {"exclude": list(Product.objects.filter(pk=pk))}
         else:
             raise ValidationError({"status": "400", "error": "There are too low eating to make recommendations"})
+
+
+def get_recommendation_key(person_card_id: int, date: datetime.date) -> str:
+    return f"recommendation:{person_card_id}:{date.isoformat()}"
+
+
+def get_recommendation_fingerprint(person_card: PersonCard, date: datetime.date) -> str:
+    """
+    Отпечаток входных данных рекомендации: версии карточки, исключений, каталога и приемы пищи за день
+    """
+    eating = Eating.objects.filter(person_card_id=person_card.pk, local_date=date).order_by("id")
+    values = (
+        person_card.version,
+        person_card.exclusion_version,
+        get_catalog_version("product"),
+        list(eating.values_list("id", "product_weight_id", "recipe_id", "water_id")),
+    )
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+def load_recommendation(person_card: PersonCard, date: datetime.date, fingerprint: str) -> Optional[dict]:
+    """
+    Рекомендации из предрассчитанной таблицы, если она актуальна, иначе расчет
+    """
+    precomputed = PrecomputedRecommendation.objects.filter(
+        person_card_id=person_card.pk, date=date, fingerprint=fingerprint
+    ).first()
+    if precomputed is None:
+        return RecommendationService(person_card, date).get_recommendation()
+    if precomputed.kind == "error":
+        raise ValidationError({"status": "400", "error": precomputed.error})
+    if precomputed.kind == "none":
+        return None
+    products = Product.objects.in_bulk(precomputed.products)
+    return {precomputed.kind: [products[pk] for pk in precomputed.products if pk in products]}
+
+
+def get_recommendation(person_card: PersonCard, date: Optional[datetime.date] = None) -> Optional[dict]:
+    """
+    Рекомендации из кэша, пересчет при изменении приемов пищи, исключений, карточки или каталога
+    """
+    if date is None:
+        date = person_card.get_local_date()
+    fingerprint = get_recommendation_fingerprint(person_card, date)
+    return get_or_set_versioned(
+        "recommendation",
+        get_recommendation_key(person_card.pk, date),
+        fingerprint,
+        lambda: load_recommendation(person_card, date, fingerprint),
+    )
+
+
+def evict_recommendation(person_card_id: int, date: datetime.date) -> None:
+    """
+    Удаление рекомендаций пользователя за день из кэша
+    """
+    cache.delete(get_recommendation_key(person_card_id, date))
@@ -0,0 +1,120 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+
+from bood_app.models import PersonCard, Product
+from bood_app.services.exclusion import get_excluded_products
+from bood_app.services.kbjy import KBJYService
+from bood_app.services.product_index import get_product_index
+
+MEALPLAN_SIZE = 4
+MEALPLAN_MAX_SIZE = 10
+MEALPLAN_CANDIDATES = 32
+MEALPLAN_NUTRIENTS = ("calories", "proteins", "fats", "carbohydrates")
+
+
+def nnls(a: np.ndarray, b: np.ndarray, max_iter: Optional[int] = None) -> np.ndarray:
+    """
+    Неотрицательный метод наименьших квадратов (Lawson-Hanson): min ||ax - b|| при x >= 0
+    """
+    n = a.shape[1]
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    tolerance = 10 * np.finfo(np.float64).eps * max(a.shape) * (np.abs(a).sum(axis=0).max() if n else 0)
+    max_iter = max_iter or 3 * n
+    gradient = a.T @ (b - a @ x)
+    iteration = 0
+    while not passive.all() and (gradient[~passive] > tolerance).any():
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+        while True:
+            iteration += 1
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(a[:, passive], b, rcond=None)[0]
+            if (z[passive] > tolerance).all() or iteration > max_iter:
+                break
+            negative = passive & (z <= tolerance)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                alpha = np.nan_to_num(np.nanmin(x[negative] / (x[negative] - z[negative])))
+            x += alpha * (z - x)
+            passive &= x > tolerance
+            x[~passive] = 0
+        x = z
+        if iteration > max_iter:
+            break
+        gradient = a.T @ (b - a @ x)
+    return np.clip(x, 0, None)
+
+
+class MealPlanService:
+    """
+    Подбор граммовок продуктов, закрывающих остаток КБЖУ до нормы
+    """
+
+    def __init__(self, person_card: PersonCard, date: Optional[datetime.date] = None):
+        if date is None:
+            date = person_card.get_local_date()
+        self.person_card = person_card
+        self.date = date
+        kbjy_service = KBJYService(person_card, date)
+        self.standard = kbjy_service.get_standard()
+        self.current = kbjy_service.get_current()
+        self.remaining = {key: max(self.standard[key] - self.current[key], 0) for key in MEALPLAN_NUTRIENTS}
+
+    def get_meal_plan(self, size: int = MEALPLAN_SIZE) -> dict:
+        """
+        Продукты с весом в граммах и итоговые КБЖУ плана
+        """
+        plan = []
+        planned = {key: 0.0 for key in MEALPLAN_NUTRIENTS}
+        target = np.array([self.remaining[key] for key in MEALPLAN_NUTRIENTS], dtype=np.float64)
+        if target.any():
+            # Отклонения считаются относительно дневной нормы, чтобы калории не перевешивали БЖУ
+            scale = 1 / np.maximum([self.standard[key] for key in MEALPLAN_NUTRIENTS], 1)
+            index = get_product_index()
+            positions, weights = self.solve(index, target * scale, scale, size)
+            ids = index.ids[positions].tolist()
+            products = Product.objects.in_bulk(ids)
+            found = np.array([pk in products for pk in ids], dtype=bool)
+            positions, weights = positions[found], weights[found]
+            plan = [
+                {"product": products[pk], "weight": int(weight)}
+                for pk, weight in zip(index.ids[positions].tolist(), weights.tolist())
+            ]
+            # Итог считается по матрице, а не по полям загруженных продуктов
+            planned = dict(zip(MEALPLAN_NUTRIENTS, (weights @ index.nutrients[positions]).tolist()))
+        return {
+            "remaining": {key: round(value) for key, value in self.remaining.items()},
+            "planned": {key: round(value) for key, value in planned.items()},
+            "products": plan,
+        }
+
+    def solve(self, index, target: np.ndarray, scale: np.ndarray, size: int) -> tuple:
+        """
+        Отбор кандидатов по направлению вектора КБЖУ и решение NNLS по ним
+        """
+        matrix = index.nutrients * scale
+        mask = ~np.isnan(matrix).any(axis=1) & (matrix > 0).any(axis=1)
+        excluded = get_excluded_products(self.person_card)
+        mask &= ~excluded.contains(index.ids)
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return candidates, np.zeros(0)
+
+        norms = np.linalg.norm(matrix[candidates], axis=1)
+        similarity = matrix[candidates] @ target / norms
+        if candidates.size > MEALPLAN_CANDIDATES:
+            top = np.argpartition(-similarity, MEALPLAN_CANDIDATES - 1)[:MEALPLAN_CANDIDATES]
+            candidates, similarity = candidates[top], similarity[top]
+        candidates = candidates[np.lexsort((index.ids[candidates], -similarity))]
+
+        weights = nnls(matrix[candidates].T, target)
+        chosen = np.flatnonzero(weights > 0)
+        if chosen.size > size:
+            chosen = chosen[np.argsort(-weights[chosen], kind="stable")[:size]]
+            chosen.sort()
+            weights = np.zeros_like(weights)
+            weights[chosen] = nnls(matrix[candidates[chosen]].T, target)
+        weights = np.round(weights[chosen])
+        keep = weights >= 1
+        return candidates[chosen][keep], weights[keep]
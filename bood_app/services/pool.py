@@ -0,0 +1,35 @@
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.context import BaseContext
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Модуль не импортирует модели: запущенный заново процесс загружает его до настройки Django
+
+
+def get_pool_context() -> BaseContext:
+    """
+    Способ запуска процессов пула: fork, где он доступен, иначе spawn.
+    Соединения с БД не наследуются: родитель закрывает их до запуска пула, процессы открывают свои
+    """
+    return get_context("fork" if "fork" in get_all_start_methods() else "spawn")
+
+
+def get_worker_settings(*names: str) -> dict:
+    """
+    Настройки родителя, которые могут отличаться от файла настроек, например у тестовой БД
+    """
+    return {name: getattr(settings, name) for name in names}
+
+
+def setup_worker(worker_settings: dict, initializer: str) -> None:
+    """
+    Настройка Django в процессе пула с настройками родителя и вызов инициализатора по пути импорта
+    """
+    if not apps.ready:
+        for name, value in worker_settings.items():
+            setattr(settings, name, value)
+        django.setup()
+    import_string(initializer)()
@@ -0,0 +1,94 @@
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+from django.db import connections
+from rest_framework.exceptions import ValidationError
+
+from bood_app.models import PersonCard, PrecomputedRecommendation
+from bood_app.services.kbjy import RecommendationService, get_recommendation_fingerprint
+from bood_app.services.pool import get_pool_context, get_worker_settings, setup_worker
+from bood_app.services.product_index import get_product_index
+
+
+def init_worker() -> None:
+    """
+    Загрузка матрицы пропорций продуктов один раз на процесс
+    """
+    get_product_index()
+
+
+def compute_recommendations(person_card_ids: list, date: Optional[datetime.date] = None) -> list:
+    """
+    Расчет рекомендаций для части карточек
+    """
+    rows = []
+    for person_card in PersonCard.objects.filter(pk__in=person_card_ids):
+        day = date or person_card.get_local_date()
+        row = {
+            "person_card_id": person_card.pk,
+            "date": day,
+            "fingerprint": get_recommendation_fingerprint(person_card, day),
+            "kind": "none",
+            "products": [],
+            "error": "",
+        }
+        try:
+            result = RecommendationService(person_card, day).get_recommendation()
+        except ValidationError as error:
+            row["kind"] = "error"
+            row["error"] = str(error.detail.get("error", "")) if isinstance(error.detail, dict) else str(error.detail)
+        else:
+            if result:
+                row["kind"], products = next(iter(result.items()))
+                row["products"] = [product.pk for product in products if product is not None]
+        rows.append(row)
+    return rows
+
+
+def save_recommendations(rows: list) -> None:
+    """
+    Запись рассчитанных рекомендаций с заменой существующих за ту же дату
+    """
+    PrecomputedRecommendation.objects.bulk_create(
+        [PrecomputedRecommendation(**row) for row in rows],
+        update_conflicts=True,
+        unique_fields=["person_card", "date"],
+        update_fields=["fingerprint", "kind", "products", "error", "datetime_add"],
+    )
+
+
+def precompute_recommendations(
+    date: Optional[datetime.date] = None, workers: int = 0, chunk_size: int = 500, progress=None
+) -> int:
+    """
+    Расчет рекомендаций для всех активных пользователей, при workers > 0 в пуле процессов
+    """
+    ids = list(PersonCard.objects.filter(person__is_active=True).order_by("id").values_list("id", flat=True))
+    chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    done = 0
+
+    def report(rows: list) -> None:
+        nonlocal done
+        save_recommendations(rows)
+        done += len(rows)
+        if progress is not None:
+            progress(done, len(ids))
+
+    if workers > 0 and chunks:
+        # Дочерние процессы открывают свои соединения с БД
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_pool_context(),
+            initializer=setup_worker,
+            initargs=(get_worker_settings("DATABASES", "CATALOG_SNAPSHOT_DIR"), f"{__name__}.init_worker"),
+        ) as executor:
+            futures = [executor.submit(compute_recommendations, chunk, date) for chunk in chunks]
+            for future in as_completed(futures):
+                report(future.result())
+    else:
+        init_worker()
+        for chunk in chunks:
+            report(compute_recommendations(chunk, date))
+    return done
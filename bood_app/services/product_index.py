@@ -0,0 +1,173 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+
+from bood_app.models import Product
+from bood_app.services.catalog import get_catalog_key, get_catalog_state, is_older_catalog_key
+from bood_app.services.exclusion import ProductIdSet
+
+# Столбцы матрицы в порядке хранения, значения на грамм продукта
+MATRIX_COLUMNS = (
+    "calories",
+    "proteins",
+    "fats",
+    "carbohydrates",
+    "water",
+    "proteins_proportion",
+    "fats_proportion",
+    "carbohydrates_proportion",
+    "vitamin_a",
+    "vitamin_b1",
+    "vitamin_b2",
+    "vitamin_b3",
+    "vitamin_e",
+    "vitamin_c",
+    "iron",
+    "calcium",
+    "sodium",
+    "potassium",
+    "phosphorus",
+)
+MATRIX_PREFIX = "product-matrix-"
+# КБЖУ и пропорции БЖУ идут подряд, поэтому выбираются срезом без копирования
+NUTRIENTS = slice(MATRIX_COLUMNS.index("calories"), MATRIX_COLUMNS.index("carbohydrates") + 1)
+PROPORTIONS = slice(MATRIX_COLUMNS.index("proteins_proportion"), MATRIX_COLUMNS.index("carbohydrates_proportion") + 1)
+
+
+def get_matrix_path(state: tuple) -> Path:
+    return Path(settings.CATALOG_SNAPSHOT_DIR) / f"{MATRIX_PREFIX}{get_catalog_key(state)}"
+
+
+def write_product_matrix(state: tuple) -> Path:
+    """
+    Выгрузка каталога в файлы .npy: id продуктов и матрица нутриентов по столбцам.
+    Каталог версии появляется целиком переименованием, прошлые версии удаляются
+    """
+    path = get_matrix_path(state)
+    rows = list(Product.objects.order_by("id").values_list("id", *MATRIX_COLUMNS))
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, len(MATRIX_COLUMNS))
+
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.mkdir(parents=True, exist_ok=True)
+    np.save(temporary / "ids.npy", ids)
+    np.save(temporary / "values.npy", np.asfortranarray(values))
+    try:
+        os.rename(temporary, path)
+    except OSError:
+        # Эту версию уже выгрузил другой процесс
+        shutil.rmtree(temporary, ignore_errors=True)
+
+    for old in path.parent.glob(f"{MATRIX_PREFIX}*"):
+        if old.is_dir() and is_older_catalog_key(old.name[len(MATRIX_PREFIX) :], state):
+            shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+class ProductMatrix:
+    """
+    Матрица нутриентов каталога, отображенная в память только для чтения.
+    Процессы одной машины разделяют ее страницы без копирования
+    """
+
+    def __init__(self, state: tuple):
+        self.state = state
+        path = get_matrix_path(state)
+        if not path.exists():
+            write_product_matrix(state)
+        self.ids = np.load(path / "ids.npy", mmap_mode="r")
+        self.values = np.load(path / "values.npy", mmap_mode="r")
+
+    def get_positions(self, ids: Iterable[int]) -> np.ndarray:
+        """
+        Номера строк продуктов, отсутствующие в матрице id пропускаются
+        """
+        ids = np.asarray(list(ids), dtype=np.int64)
+        positions = np.searchsorted(self.ids, ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == ids[found]
+        return positions[found]
+
+    def get_column(self, name: str) -> np.ndarray:
+        return self.values[:, MATRIX_COLUMNS.index(name)]
+
+
+class ProductIndex:
+    """
+    Индекс продуктов по пропорциям БЖУ для поиска ближайших соседей и матрица КБЖУ на грамм
+    """
+
+    def __init__(self, state: tuple):
+        self.state = state
+        self.matrix = ProductMatrix(state)
+        self.ids = self.matrix.ids
+        self.points = self.matrix.values[:, PROPORTIONS]
+        self.nutrients = self.matrix.values[:, NUTRIENTS]
+
+    def nearest(
+        self,
+        point: Iterable[float],
+        k: int = 4,
+        exclude: Optional[ProductIdSet] = None,
+        max_distance: Optional[float] = None,
+    ) -> list:
+        """
+        Id k ближайших продуктов по максимальному отклонению пропорций, по возрастанию расстояния
+        """
+        distance = np.abs(self.points - np.asarray(point, dtype=np.float64)).max(axis=1)
+        mask = ~np.isnan(distance)
+        if max_distance is not None:
+            mask &= distance <= max_distance
+        if exclude is not None:
+            mask &= ~exclude.contains(self.ids)
+
+        candidates = np.flatnonzero(mask)
+        if candidates.size > k:
+            kth = np.partition(distance[candidates], k - 1)[k - 1]
+            candidates = candidates[distance[candidates] <= kth]
+        candidates = candidates[np.lexsort((self.ids[candidates], distance[candidates]))][:k]
+        return self.ids[candidates].tolist()
+
+    def richest(self, ids: Iterable[int], column: str) -> Optional[int]:
+        """
+        Id продукта из списка с наибольшим значением столбца, при равенстве - с наибольшим id
+        """
+        positions = self.matrix.get_positions(ids)
+        values = self.matrix.get_column(column)[positions]
+        positions, values = positions[~np.isnan(values)], values[~np.isnan(values)]
+        if positions.size == 0:
+            return None
+        return int(self.ids[positions[np.lexsort((self.ids[positions], values))[-1]]])
+
+
+product_index: Optional[ProductIndex] = None
+product_index_lock = threading.Lock()
+
+
+def get_product_index() -> ProductIndex:
+    """
+    Индекс процесса, перестраивается при изменении версии каталога
+    """
+    global product_index
+    state = get_catalog_state("product")
+    index = product_index
+    if index is None or index.state != state:
+        with product_index_lock:
+            index = product_index
+            if index is None or index.state != state:
+                index = ProductIndex(state)
+                product_index = index
+    return index
+
+
+def clear_product_index() -> None:
+    """
+    Сброс индекса процесса
+    """
+    global product_index
+    product_index = None
@@ -0,0 +1,152 @@
+from django.db import connections
+from django.db.models import Case, FloatField, IntegerField, Q, QuerySet, When
+from django.db.models.expressions import RawSQL
+
+from bood_app.utils.text import get_search_tokens
+
+SEARCH_LIMIT = 1000
+PRODUCT_TABLE = "bood_app_product"
+FTS_TABLE = "bood_app_product_fts"
+TRIGRAM_INDEX = "bood_app_product_search_trgm"
+
+
+def order_by_ids(queryset: QuerySet, ids: list) -> QuerySet:
+    """
+    Отбор продуктов по списку id с сохранением его порядка
+    """
+    rank = Case(*[When(pk=pk, then=position) for position, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).annotate(search_rank=rank).order_by("search_rank")
+
+
+class SearchBackend:
+    """
+    Поиск продуктов по началу основ слов названия без полнотекстового индекса
+    """
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        tokens = get_search_tokens(query)
+        if not tokens:
+            return queryset.none()
+        return self.search_tokens(queryset, tokens)
+
+    def search_tokens(self, queryset: QuerySet, tokens: list) -> QuerySet:
+        condition = Q()
+        for token in tokens:
+            condition &= Q(search_title__startswith=token) | Q(search_title__contains=f" {token}")
+        return queryset.filter(condition).order_by("id")
+
+    def install(self, connection) -> None:
+        """
+        Создание поискового индекса, вызывается после миграций
+        """
+
+    def uninstall(self, connection) -> None:
+        """
+        Удаление поискового индекса
+        """
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Полнотекстовый поиск SQLite FTS5 с ранжированием bm25
+    """
+
+    def search_tokens(self, queryset: QuerySet, tokens: list) -> QuerySet:
+        match = " AND ".join(f'"{token}"*' for token in tokens)
+        # Отбор подзапросом без лимита, чтобы фильтры, сортировка и пагинация видели все совпадения
+        found = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        rank = RawSQL(
+            f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {PRODUCT_TABLE}.id",
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=found).annotate(search_rank=rank).order_by("search_rank", "id")
+
+    def install(self, connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"search_title, content='{PRODUCT_TABLE}', content_rowid='id', tokenize='unicode61')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {PRODUCT_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, search_title) VALUES (new.id, new.search_title); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {PRODUCT_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_title) "
+                f"VALUES ('delete', old.id, old.search_title); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF search_title ON {PRODUCT_TABLE} "
+                f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_title) "
+                f"VALUES ('delete', old.id, old.search_title); "
+                f"INSERT INTO {FTS_TABLE}(rowid, search_title) VALUES (new.id, new.search_title); END"
+            )
+            # Пересоздание таблицы продуктов в миграциях SQLite удаляет триггеры, поэтому индекс перестраивается
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    def uninstall(self, connection) -> None:
+        with connection.cursor() as cursor:
+            for trigger in ("insert", "delete", "update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Поиск PostgreSQL по началу основ слов с триграммным индексом и ранжированием по похожести
+    """
+
+    def search_tokens(self, queryset: QuerySet, tokens: list) -> QuerySet:
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return (
+            super()
+            .search_tokens(queryset, tokens)
+            .annotate(search_rank=TrigramSimilarity("search_title", " ".join(tokens)))
+            .order_by("-search_rank", "id")
+        )
+
+    def install(self, connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {PRODUCT_TABLE} USING gin (search_title gin_trgm_ops)"
+            )
+
+    def uninstall(self, connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(connection) -> SearchBackend:
+    """
+    Поисковый бэкенд по типу базы данных
+    """
+    return SEARCH_BACKENDS.get(connection.vendor, SearchBackend)()
+
+
+def search_products(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Поиск продуктов по названию с ранжированием
+    """
+    return get_search_backend(connections[queryset.db]).search(queryset, query)
+
+
+def install_search_index(connection) -> None:
+    """
+    Создание поискового индекса, если в таблице продуктов уже есть поисковая строка
+    """
+    with connection.cursor() as cursor:
+        if PRODUCT_TABLE not in connection.introspection.table_names(cursor):
+            return
+        columns = [column.name for column in connection.introspection.get_table_description(cursor, PRODUCT_TABLE)]
+    if "search_title" in columns:
+        get_search_backend(connection).install(connection)
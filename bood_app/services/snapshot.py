@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from bood_app.models import DeletedProduct, Product
+from bood_app.services.catalog import get_catalog_key, get_catalog_state, is_older_catalog_key
+
+# Поле снимка и путь к значению в ORM
+SNAPSHOT_FIELDS = (
+    ("id", "id"),
+    ("title", "title"),
+    ("category", "category_id"),
+    ("calories", "calories"),
+    ("proteins", "proteins"),
+    ("fats", "fats"),
+    ("carbohydrates", "carbohydrates"),
+    ("water", "water"),
+    ("proteins_proportion", "proteins_proportion"),
+    ("fats_proportion", "fats_proportion"),
+    ("carbohydrates_proportion", "carbohydrates_proportion"),
+    ("vitamin_a", "vitamin_a"),
+    ("vitamin_b1", "vitamin_b1"),
+    ("vitamin_b2", "vitamin_b2"),
+    ("vitamin_b3", "vitamin_b3"),
+    ("vitamin_e", "vitamin_e"),
+    ("vitamin_c", "vitamin_c"),
+    ("iron", "iron"),
+    ("calcium", "calcium"),
+    ("sodium", "sodium"),
+    ("potassium", "potassium"),
+    ("phosphorus", "phosphorus"),
+)
+SNAPSHOT_PREFIX = "product-"
+SNAPSHOT_SUFFIX = ".json.gz"
+# Изменения с версии клиента хранятся в кэше, полный снимок - на диске
+SNAPSHOT_DELTA_TIMEOUT = 3600
+# Максимальное сжатие втрое медленнее при выигрыше в размере около процента
+SNAPSHOT_COMPRESSION = 6
+
+snapshot_lock = threading.Lock()
+
+
+def build_snapshot(version: int, since: int = 0) -> bytes:
+    """
+    Сжатый JSON каталога: продукты строками в порядке fields и id удаленных продуктов.
+    При since > 0 только продукты, измененные и удаленные после этой версии
+    """
+    products = Product.objects.order_by("id")
+    deleted = []
+    if since:
+        products = products.filter(version__gt=since)
+        deleted = DeletedProduct.objects.filter(version__gt=since).order_by("product_id")
+        deleted = list(deleted.values_list("product_id", flat=True).distinct())
+    rows = [list(row) for row in products.values_list(*[lookup for _, lookup in SNAPSHOT_FIELDS])]
+    data = {
+        "version": version,
+        "since": since,
+        "fields": [name for name, _ in SNAPSHOT_FIELDS],
+        "products": rows,
+        "deleted": deleted,
+    }
+    content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(content, compresslevel=SNAPSHOT_COMPRESSION)
+
+
+def get_snapshot_path(state: tuple) -> Path:
+    return Path(settings.CATALOG_SNAPSHOT_DIR) / f"{SNAPSHOT_PREFIX}{get_catalog_key(state)}{SNAPSHOT_SUFFIX}"
+
+
+def build_catalog_snapshot(state: Optional[tuple] = None) -> Path:
+    """
+    Запись полного снимка каталога на диск с удалением снимков прошлых версий.
+    Вызывается и после массовой загрузки каталога, чтобы первый запрос клиента не ждал сборки
+    """
+    if state is None:
+        state = get_catalog_state("product")
+    version = state[0]
+    path = get_snapshot_path(state)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(build_snapshot(version))
+    os.replace(temporary, path)
+    for old in path.parent.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"):
+        if is_older_catalog_key(old.name[len(SNAPSHOT_PREFIX) : -len(SNAPSHOT_SUFFIX)], state):
+            old.unlink(missing_ok=True)
+    return path
+
+
+def get_catalog_snapshot(state: tuple) -> Path:
+    """
+    Путь к полному снимку версии каталога, снимок строится один раз на версию
+    """
+    path = get_snapshot_path(state)
+    if not path.exists():
+        with snapshot_lock:
+            if not path.exists():
+                build_catalog_snapshot(state)
+    return path
+
+
+def get_catalog_delta(state: tuple, since: int) -> bytes:
+    """
+    Сжатые изменения каталога после версии клиента
+    """
+    key = f"catalog_snapshot:{get_catalog_key(state)}:{since}"
+    content = cache.get(key)
+    if content is None:
+        content = build_snapshot(state[0], since)
+        cache.set(key, content, SNAPSHOT_DELTA_TIMEOUT)
+    return content
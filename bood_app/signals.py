@@ -1,24 +1,23 @@
-from django.db.models.signals import pre_delete
+from django.db import connections
+from django.db.models import F
+from django.db.models.signals import pre_delete, post_save, post_delete, m2m_changed, post_migrate
 from django.dispatch import receiver
 
-from bood_app.models import Product, Eating
-
-
-@receiver(pre_delete, sender=Product)
-def set_delete_product(sender, instance, **kwargs) -> None:
-    """
-    Удаление микроэлементов и витаминов
-    """
-    if instance.vitamins:
-        vitamins = instance.vitamins
-        instance.vitamins = None
-        instance.save()
-        vitamins.delete()
-    if instance.microelements:
-        microelements = instance.microelements
-        instance.microelements = None
-        instance.save()
-        microelements.delete()
+from bood_app.models import (
+    Product,
+    Eating,
+    PersonCard,
+    Measurement,
+    ProductCategory,
+    FAQ,
+    FemaleType,
+    DeletedProduct,
+)
+from bood_app.services.catalog import CATALOG_NAMES, bump_catalog_version
+from bood_app.services.daily_intake import INTAKE_FIELDS, invalidate_product_daily_intake, refresh_daily_intake
+from bood_app.services.exclusion import refresh_excluded_products, set_exclusion_changed
+from bood_app.services.kbjy import evict_recommendation
+from bood_app.services.search import install_search_index
 
 
 @receiver(pre_delete, sender=Eating)
@@ -36,3 +35,105 @@ def set_delete_eating(sender, instance, **kwargs) -> None:
         instance.water = None
         instance.save()
         water.delete()
+
+
+@receiver(post_save, sender=Eating)
+def set_daily_intake(sender, instance, **kwargs) -> None:
+    """
+    Пересчет дневного итога после добавления или изменения приема пищи
+    """
+    refresh_daily_intake(instance.person_card_id, instance.local_date)
+    evict_recommendation(instance.person_card_id, instance.local_date)
+
+
+@receiver(post_delete, sender=Eating)
+def set_delete_daily_intake(sender, instance, **kwargs) -> None:
+    """
+    Пересчет дневного итога после удаления приема пищи
+    """
+    refresh_daily_intake(instance.person_card_id, instance.local_date, create=False)
+    evict_recommendation(instance.person_card_id, instance.local_date)
+
+
+@receiver(post_save, sender=PersonCard)
+def set_person_card_version(sender, instance, **kwargs) -> None:
+    """
+    Новая версия карточки для сброса кэша норм КБЖУ, увеличивается атомарно вместе с версией от замеров
+    """
+    cards = PersonCard.objects.filter(pk=instance.pk)
+    cards.update(version=F("version") + 1)
+    instance.version = cards.values_list("version", flat=True).get()
+
+
+@receiver(post_save, sender=Measurement)
+@receiver(post_delete, sender=Measurement)
+def set_measurement_version(sender, instance, **kwargs) -> None:
+    """
+    Новая версия карточки после изменения замеров
+    """
+    PersonCard.objects.filter(pk=instance.person_card_id).update(version=F("version") + 1)
+
+
+@receiver(post_save, sender=Product)
+def set_product_catalog_version(sender, instance, **kwargs) -> None:
+    """
+    Новая версия каталога продуктов, продукт помечается ею для выгрузки изменений
+    """
+    instance.version = bump_catalog_version("product")
+    Product.objects.filter(pk=instance.pk).update(version=instance.version)
+
+
+@receiver(post_save, sender=Product)
+def set_product_daily_intake(sender, instance, created, update_fields=None, **kwargs) -> None:
+    """
+    Сброс дневных итогов с продуктом после изменения его КБЖУ
+    """
+    if created or (update_fields is not None and not set(update_fields) & set(INTAKE_FIELDS)):
+        return
+    invalidate_product_daily_intake([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def set_delete_product_catalog_version(sender, instance, **kwargs) -> None:
+    """
+    Новая версия каталога продуктов с записью удаленного продукта
+    """
+    DeletedProduct.objects.create(product_id=instance.pk, version=bump_catalog_version("product"))
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+@receiver(post_save, sender=FemaleType)
+@receiver(post_delete, sender=FemaleType)
+def set_reference_catalog_version(sender, instance, **kwargs) -> None:
+    """
+    Новая версия справочника категорий, FAQ или типов женщин
+    """
+    bump_catalog_version(CATALOG_NAMES[sender])
+
+
+@receiver(m2m_changed, sender=PersonCard.exclude_products.through)
+@receiver(m2m_changed, sender=PersonCard.exclude_category.through)
+def set_exclusion(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    """
+    Пересчет исключенных продуктов пользователя
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        set_exclusion_changed(pk_set)
+        return
+    set_exclusion_changed([instance.pk])
+    instance.exclusion_version += 1
+    refresh_excluded_products(instance)
+
+
+@receiver(post_migrate)
+def set_search_index(sender, using, **kwargs) -> None:
+    """
+    Восстановление поискового индекса продуктов после миграций
+    """
+    if sender.name == "bood_app":
+        install_search_index(connections[using])
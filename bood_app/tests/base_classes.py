@@ -1,10 +1,12 @@
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 
 from bood_account.models import Person
 from bood_app.models import (
     Product,
-    Vitamin,
-    MicroElement,
     ProductCategory,
     FemaleType,
     Measurement,
@@ -15,44 +17,24 @@ from bood_app.models import (
     Water,
     FAQ,
 )
-from rest_framework.test import APITestCase
+from bood_app.services.autocomplete import clear_autocomplete_index
+from bood_app.services.fuzzy import clear_fuzzy_index
+from bood_app.services.product_index import clear_product_index
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 
-class BaseInitTestCase(APITestCase):
+class BaseInitMixin:
     def setUp(self):
-        self.vitamin1 = Vitamin.objects.create(
-            a=0.0,
-            b1=0.0,
-            b2=0.0,
-            b3=0.0,
-            e=0.0,
-            c=0.0,
-        )
-        self.vitamin2 = Vitamin.objects.create(
-            a=0.0,
-            b1=0.0,
-            b2=0.0,
-            b3=0.0,
-            e=0.0,
-            c=0.0,
-        )
-        self.vitamin3 = Vitamin.objects.create(
-            a=0.0,
-            b1=0.0,
-            b2=0.0,
-            b3=0.0,
-            e=0.0,
-            c=0.0,
-        )
-        self.microelement1 = MicroElement.objects.create(
-            iron=0.0, calcium=0.0, sodium=0.0, potassium=0.0, phosphorus=0.0
-        )
-        self.microelement2 = MicroElement.objects.create(
-            iron=0.0, calcium=0.0, sodium=0.0, potassium=0.0, phosphorus=0.0
-        )
-        self.microelement3 = MicroElement.objects.create(
-            iron=0.0, calcium=0.0, sodium=0.0, potassium=0.0, phosphorus=0.0
-        )
+        cache.clear()
+        # Версии каталога повторяются между тестами, поэтому файлы снимков у каждого теста свои
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        snapshot_settings = override_settings(CATALOG_SNAPSHOT_DIR=directory.name)
+        snapshot_settings.enable()
+        self.addCleanup(snapshot_settings.disable)
+        clear_product_index()
+        clear_autocomplete_index()
+        clear_fuzzy_index()
         self.category1 = ProductCategory.objects.create(title="Овощи")
         self.category2 = ProductCategory.objects.create(title="Птица")
         self.category3 = ProductCategory.objects.create(title="Хлеб")
@@ -67,8 +49,6 @@ class BaseInitTestCase(APITestCase):
             fats_proportion=1.0,
             carbohydrates_proportion=41.0,
             category_id=1,
-            vitamins_id=1,
-            microelements_id=1,
         )
         self.product2 = Product.objects.create(
             title="Курица",
@@ -81,8 +61,6 @@ class BaseInitTestCase(APITestCase):
             fats_proportion=1.01,
             carbohydrates_proportion=0.0,
             category_id=2,
-            vitamins_id=2,
-            microelements_id=2,
         )
         self.product3 = Product.objects.create(
             title="Батон",
@@ -95,8 +73,6 @@ class BaseInitTestCase(APITestCase):
             fats_proportion=1.0,
             carbohydrates_proportion=22.04,
             category_id=3,
-            vitamins_id=3,
-            microelements_id=3,
         )
         self.femaletype = FemaleType.objects.create(title="Беременная")
         self.person1 = Person.objects.create_superuser(email="admin@admin.com", password="12345")
@@ -136,3 +112,11 @@ class BaseInitTestCase(APITestCase):
         response = self.client.post(create_jwt_url, create_jwt_data)
         access_token = response.data["access"]
         return {"Authorization": f"JWT {access_token}"}
+
+
+class BaseInitTestCase(BaseInitMixin, APITestCase):
+    pass
+
+
+class BaseInitTransactionTestCase(BaseInitMixin, APITransactionTestCase):
+    pass
@@ -0,0 +1,43 @@
+import copy
+import tempfile
+
+import numpy as np
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from bood_app.benchmarks.runner import compare, run_benchmarks
+from bood_app.benchmarks.synthetic import create_catalog, get_proportions
+from bood_app.models import Product
+
+
+class BenchmarkTestCase(APITestCase):
+    def setUp(self) -> None:
+        # Замеры строят матрицу нутриентов, она не должна попасть в каталог снимков проекта
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        snapshot_settings = override_settings(CATALOG_SNAPSHOT_DIR=directory.name)
+        snapshot_settings.enable()
+        self.addCleanup(snapshot_settings.disable)
+
+    def test_proportions(self) -> None:
+        proportions = get_proportions(np.array([[0.014, 0.002, 0.082], [0.182, 0.184, 0.0], [0.0, 0.0, 0.0]]))
+        np.testing.assert_allclose(proportions, [[7.0, 1.0, 41.0], [1.0, 1.01, 0.0], [0.0, 0.0, 0.0]])
+
+    def test_create_catalog(self) -> None:
+        self.assertEqual(create_catalog(30), 30)
+        self.assertEqual(create_catalog(50), 20)
+        self.assertEqual(create_catalog(50), 0)
+        self.assertEqual(Product.objects.count(), 50)
+
+    def test_run_and_compare(self) -> None:
+        results = run_benchmarks([20, 40], persons=2, days=3, repeat=2)
+        self.assertEqual(set(results["results"]), {"20", "40"})
+        case = results["results"]["40"]["view.recommendation"]
+        self.assertEqual(set(case), {"cold_ms", "warm_ms", "cold_queries", "warm_queries"})
+        self.assertEqual(compare(results, results), [])
+
+        baseline = copy.deepcopy(results)
+        baseline["results"]["40"]["view.recommendation"]["warm_queries"] -= 1
+        baseline["results"]["40"]["view.current"]["warm_ms"] = 0.0
+        results["results"]["40"]["view.current"]["warm_ms"] = 10.0
+        self.assertEqual(len(compare(results, baseline)), 2)
@@ -1,7 +1,12 @@
+import datetime
+
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
-from bood_app.models import PersonCard, Measurement
+from bood_app.models import PersonCard, Measurement, ProductWeight, Eating, Water, DailyIntake
+from bood_app.services.caching import get_counter
+from bood_app.services.kbjy import KBJYService, get_history, get_intake, round_intake
 from bood_app.tests.base_classes import BaseInitTestCase
 
 
@@ -11,6 +16,8 @@ class CalculateTestCase(BaseInitTestCase):
         self.token = self.get_authorization(1)
         self.url_standard = reverse("standard")
         self.url_current = reverse("current")
+        self.url_history = reverse("history")
+        self.url_summary = reverse("summary")
 
     def test_get_valid_standard_male(self) -> None:
         standard_data = {
@@ -73,6 +80,24 @@ class CalculateTestCase(BaseInitTestCase):
         self.assertEqual(response.data["status"], "200")
         self.assertEqual(response.data["detail"], current_data)
 
+    def test_get_valid_summary(self) -> None:
+        summary_data = {
+            "imt": {"type": "Эктоморф", "value": 26.1},
+            "standard": {"calories": 2173, "proteins": 61, "fats": 53, "carbohydrates": 225, "water": 2400},
+            "current": {"calories": 497, "proteins": 26, "fats": 21, "carbohydrates": 50, "water": 197},
+            "remaining": {"calories": 1676, "proteins": 35, "fats": 32, "carbohydrates": 175, "water": 2203},
+            "percent": {"calories": 23, "proteins": 43, "fats": 40, "carbohydrates": 22, "water": 8},
+        }
+        response = self.client.get(self.url_summary, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "200")
+        self.assertEqual(response.data["detail"], summary_data)
+
+    def test_summary_queries(self) -> None:
+        with self.assertNumQueries(2):
+            service = KBJYService(self.person_card1)
+            service.get_summary()
+
     def test_get_invalid_date(self) -> None:
         url = self.url_current + "?date=1234"
         response = self.client.get(url, headers=self.token)
@@ -93,3 +118,148 @@ class CalculateTestCase(BaseInitTestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data["status"], "400")
         self.assertEqual(response.data["error"], "Measurements not found")
+
+    def test_current_constant_queries(self) -> None:
+        service = KBJYService(self.person_card1)
+        DailyIntake.objects.all().delete()
+        with self.assertNumQueries(3):
+            service.get_current()
+
+        for _ in range(10):
+            product_weight = ProductWeight.objects.create(weight=50, product=self.product3)
+            Eating.objects.create(product_weight=product_weight, person_card=self.person_card1)
+        DailyIntake.objects.all().delete()
+        with self.assertNumQueries(3):
+            current = service.get_current()
+        self.assertEqual(current["calories"], 1792)
+
+    def test_current_water_other_person(self) -> None:
+        person_card2 = PersonCard.objects.create(
+            height=165,
+            age=25,
+            gender="female",
+            activity=1.2,
+            person=self.person2,
+        )
+        Eating.objects.create(water=Water.objects.create(weight=500), person_card=person_card2)
+        Measurement.objects.create(weight=80, chest=100, waist=70, hips=90, hand=16, person_card=person_card2)
+        self.assertEqual(KBJYService(self.person_card1).get_current()["water"], 197)
+        self.assertEqual(KBJYService(person_card2).get_current()["water"], 500)
+
+    def test_get_valid_history(self) -> None:
+        today = timezone.localdate()
+        response = self.client.get(self.url_history, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        days = response.data["detail"]["days"]
+        self.assertEqual(len(days), 30)
+        self.assertEqual(days[0]["date"], str(today - datetime.timedelta(days=29)))
+        self.assertIsNone(days[0]["standard"])
+        self.assertIsNone(days[0]["measurement"])
+        self.assertEqual(days[0]["current"]["calories"], 0)
+        self.assertEqual(days[-1]["date"], str(today))
+        self.assertEqual(days[-1]["standard"]["calories"], 2173)
+        self.assertEqual(days[-1]["current"]["calories"], 497)
+        self.assertEqual(days[-1]["current"]["water"], 197)
+        self.assertEqual(days[-1]["measurement"]["weight"], 80)
+
+    def test_history_measurement_in_effect(self) -> None:
+        today = timezone.localdate()
+        Measurement.objects.filter(pk=self.measurement.pk).update(
+            datetime_add=timezone.now() - datetime.timedelta(days=5), local_date=today - datetime.timedelta(days=5)
+        )
+        Measurement.objects.create(weight=90, chest=100, waist=70, hips=90, hand=16, person_card=self.person_card1)
+        history = get_history(self.person_card1, today - datetime.timedelta(days=6), today)
+        self.assertIsNone(history[0]["measurement"])
+        self.assertEqual(history[1]["measurement"].weight, 80)
+        self.assertEqual(history[1]["standard"]["water"], 2400)
+        self.assertEqual(history[-1]["measurement"].weight, 90)
+        self.assertEqual(history[-1]["standard"]["water"], 2700)
+
+    def test_history_constant_queries(self) -> None:
+        today = timezone.localdate()
+        with self.assertNumQueries(4):
+            get_history(self.person_card1, today - datetime.timedelta(days=7), today)
+        for _ in range(10):
+            product_weight = ProductWeight.objects.create(weight=50, product=self.product3)
+            Eating.objects.create(product_weight=product_weight, person_card=self.person_card1)
+        with self.assertNumQueries(4):
+            get_history(self.person_card1, today - datetime.timedelta(days=365), today)
+
+    def test_history_without_ledger(self) -> None:
+        today = timezone.localdate()
+        for days in range(1, 11):
+            product_weight = ProductWeight.objects.create(weight=100, product=self.product2)
+            eating = Eating.objects.create(product_weight=product_weight, person_card=self.person_card1)
+            Eating.objects.filter(pk=eating.pk).update(local_date=today - datetime.timedelta(days=days))
+        expected = {
+            date: round_intake(get_intake(self.person_card1.pk, date))
+            for date in (today, today - datetime.timedelta(days=3))
+        }
+        DailyIntake.objects.all().delete()
+        with self.assertNumQueries(6):
+            history = get_history(self.person_card1, today - datetime.timedelta(days=365), today)
+        current = {day["date"]: day["current"] for day in history}
+        for date, intake in expected.items():
+            self.assertEqual(current[date], intake)
+        self.assertEqual(current[today - datetime.timedelta(days=3)]["calories"], 238)
+
+    def test_get_invalid_history_range(self) -> None:
+        url = self.url_history + "?from=2024-02-01&to=2024-01-01"
+        response = self.client.get(url, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Invalid date range")
+
+        url = self.url_history + "?from=2022-01-01&to=2024-01-01"
+        response = self.client.get(url, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Date range is too long")
+
+    def test_current_person_time_zone(self) -> None:
+        self.person_card1.time_zone = "America/New_York"
+        self.person_card1.save()
+        eating = Eating.objects.create(
+            water=Water.objects.create(weight=300),
+            person_card=self.person_card1,
+            datetime_add=datetime.datetime(2024, 1, 1, 2, 0, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(eating.local_date, datetime.date(2023, 12, 31))
+        service = KBJYService(self.person_card1, datetime.date(2023, 12, 31), self.measurement)
+        self.assertEqual(service.get_current()["water"], 300)
+        service = KBJYService(self.person_card1, datetime.date(2024, 1, 1), self.measurement)
+        self.assertEqual(service.get_current()["water"], 0)
+
+    def test_standard_cache(self) -> None:
+        counter = get_counter("standard")
+        counter.reset()
+        KBJYService(self.person_card1).get_standard()
+        self.assertEqual((counter.hits, counter.misses), (0, 1))
+
+        with self.assertNumQueries(0):
+            standard = KBJYService(self.person_card1).get_standard()
+        self.assertEqual(standard["calories"], 2173)
+        self.assertEqual((counter.hits, counter.misses), (1, 1))
+
+        Measurement.objects.create(weight=90, chest=100, waist=70, hips=90, hand=16, person_card=self.person_card1)
+        self.person_card1.refresh_from_db()
+        self.assertEqual(KBJYService(self.person_card1).get_standard()["water"], 2700)
+        self.assertEqual((counter.hits, counter.misses), (1, 2))
+
+        self.person_card1.age = 40
+        self.person_card1.save()
+        self.assertEqual(KBJYService(self.person_card1).get_standard()["calories"], 2134)
+        self.assertEqual((counter.hits, counter.misses), (1, 3))
+
+    def test_standard_cache_stale_person_card(self) -> None:
+        stale = PersonCard.objects.get(pk=self.person_card1.pk)
+        Measurement.objects.create(weight=90, chest=100, waist=70, hips=90, hand=16, person_card=self.person_card1)
+        self.person_card1.refresh_from_db()
+        cached = KBJYService(self.person_card1).get_standard()
+
+        stale.age = 40
+        stale.save()
+        self.assertEqual(stale.version, self.person_card1.version + 1)
+        self.assertEqual(PersonCard.objects.get(pk=stale.pk).version, stale.version)
+        self.assertEqual(PersonCard.objects.get(pk=stale.pk).age, 40)
+        service = KBJYService(stale)
+        self.assertEqual(service.get_standard(), service.calculate_standard())
+        self.assertNotEqual(service.get_standard(), cached)
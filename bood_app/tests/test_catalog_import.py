@@ -0,0 +1,122 @@
+import io
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from bood_app.models import DailyIntake, Product, ProductCategory
+from bood_app.services.catalog import get_catalog_version
+from bood_app.services.kbjy import KBJYService
+from bood_app.tests.base_classes import BaseInitTestCase
+from bood_app.utils.json_stream import iter_json_object
+
+
+def get_record(proteins: float, category: str = "Овощи") -> dict:
+    return {
+        "Витамины": {"Витамин C, аскорбиновая": proteins * 10},
+        "Микроэлементы": {"Железо, Fe": proteins * 2, "Калий, K": 1.5},
+        "КБЖУ+Вода": {"Белки": proteins, "Жиры": 0.01, "Углеводы": 0.1, "Калорийность": 0.5, "Вода": 0.8},
+        "БЖУ": {"Б": 2.0, "Ж": 1.0, "У": 10.0},
+        "Категория": category,
+    }
+
+
+class CatalogImportTestCase(BaseInitTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.catalog = {
+            "Морковь": get_record(0.013),
+            "Лук": get_record(0.014),
+            "Гречка": get_record(0.126, "Крупы"),
+            "Яблоко": get_record(0.004, None),
+        }
+
+    def import_catalog(self, catalog: dict) -> str:
+        stdout = io.StringIO()
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".json") as file:
+            json.dump(catalog, file, ensure_ascii=False, indent=2)
+            file.flush()
+            call_command("import_catalog", file.name, batch_size=2, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_import(self) -> None:
+        output = self.import_catalog(self.catalog)
+        self.assertIn("Imported 3 products, updated 1, unchanged 0", output)
+        self.assertIn("rows/s", output)
+
+        buckwheat = Product.objects.select_related("category").get(title="Гречка")
+        self.assertEqual(buckwheat.proteins, 0.126)
+        self.assertEqual(buckwheat.carbohydrates_proportion, 10.0)
+        self.assertAlmostEqual(buckwheat.vitamins.c, 1.26)
+        self.assertEqual(buckwheat.vitamins.a, 0.0)
+        self.assertAlmostEqual(buckwheat.microelements.iron, 0.252)
+        self.assertEqual(buckwheat.category.title, "Крупы")
+        self.assertEqual(buckwheat.search_title, "гречк")
+        self.assertAlmostEqual(buckwheat.proteins_density, 0.126 / 0.5)
+        self.assertEqual(buckwheat.version, get_catalog_version("product"))
+        self.assertIsNone(Product.objects.get(title="Яблоко").category)
+        self.assertEqual(ProductCategory.objects.filter(title="Овощи").count(), 1)
+        onion = Product.objects.get(title="Лук")
+        self.assertEqual(onion.pk, self.product1.pk)
+        self.assertEqual(onion.proteins, 0.014)
+        self.assertAlmostEqual(onion.vitamins.c, 0.14)
+
+    def test_import_again(self) -> None:
+        self.import_catalog(self.catalog)
+        version, count = get_catalog_version("product"), Product.objects.count()
+        output = self.import_catalog(self.catalog)
+        self.assertIn("Imported 0 products, updated 0, unchanged 4", output)
+        self.assertEqual((get_catalog_version("product"), Product.objects.count()), (version, count))
+
+    def test_import_changed(self) -> None:
+        self.import_catalog(self.catalog)
+        version = get_catalog_version("product")
+
+        self.catalog["Морковь"] = get_record(0.02)
+        self.catalog["Свекла"] = get_record(0.015)
+        output = self.import_catalog(self.catalog)
+        self.assertIn("Imported 1 products, updated 1, unchanged 3", output)
+        self.assertEqual(get_catalog_version("product"), version + 1)
+
+        updated = Product.objects.get(title="Морковь")
+        self.assertEqual(updated.proteins, 0.02)
+        self.assertAlmostEqual(updated.vitamins.c, 0.2)
+        self.assertAlmostEqual(updated.microelements.iron, 0.04)
+        self.assertEqual(updated.version, version + 1)
+        self.assertEqual(Product.objects.get(title="Гречка").version, version)
+        self.assertEqual(
+            list(Product.objects.filter(version__gt=version).order_by("title").values_list("title", flat=True)),
+            ["Морковь", "Свекла"],
+        )
+
+    def test_import_daily_intake(self) -> None:
+        date = DailyIntake.objects.get(person_card=self.person_card1).date
+        self.import_catalog({"Курица": get_record(0.3)})
+        self.assertFalse(DailyIntake.objects.filter(person_card=self.person_card1).exists())
+        current = KBJYService(self.person_card1, date).get_current()
+        self.assertEqual(current["proteins"], round(0.3 * 100 + 0.077 * 100))
+
+    def test_import_truncated(self) -> None:
+        version = get_catalog_version("product")
+        text = json.dumps(self.catalog, ensure_ascii=False, indent=2)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".json") as file:
+            file.write(text[: text.index('"Яблоко"')])
+            file.flush()
+            with self.assertRaises(CommandError):
+                call_command("import_catalog", file.name, batch_size=2, stdout=io.StringIO())
+        self.assertEqual(get_catalog_version("product"), version + 1)
+        self.assertEqual(Product.objects.get(title="Морковь").version, version + 1)
+        self.assertFalse(Product.objects.filter(title="Яблоко").exists())
+
+    def test_import_invalid(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command("import_catalog", "/nonexistent/product_db.json", stdout=io.StringIO())
+
+    def test_iter_json_object(self) -> None:
+        text = json.dumps(self.catalog, ensure_ascii=False, indent=2)
+        for chunk_size in (1, 7, 1024):
+            self.assertEqual(dict(iter_json_object(io.StringIO(text), chunk_size)), self.catalog)
+        self.assertEqual(list(iter_json_object(io.StringIO('{"a": 12}'), 1)), [("a", 12)])
+        with self.assertRaises(ValueError):
+            list(iter_json_object(io.StringIO('{"a": 1 "b": 2}')))
@@ -0,0 +1,63 @@
+import random
+
+from django.utils import timezone
+
+from bood_account.models import Person
+from bood_app.models import PersonCard, Measurement
+from bood_app.services.cohort import compute_standards
+from bood_app.services.kbjy import KBJYService
+from bood_app.tests.base_classes import BaseInitTestCase
+from bood_app.utils.resources import ACTIVITY_TYPE
+
+
+class CohortTestCase(BaseInitTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.date = timezone.localdate()
+
+    def create_cohort(self, size: int, seed: int) -> None:
+        rnd = random.Random(seed)
+        hands = [10.0, 15.9, 16.0, 16.5, 17.0, 17.1, 18.0, 19.5, 20.0, 20.1, 30.0]
+        persons = Person.objects.bulk_create(Person(email=f"cohort{seed}_{i}@bood.ru") for i in range(size))
+        person_cards = PersonCard.objects.bulk_create(
+            PersonCard(
+                height=rnd.randint(100, 250),
+                age=rnd.randint(18, 100),
+                gender=rnd.choice(["male", "female"]),
+                activity=rnd.choice(ACTIVITY_TYPE)[0],
+                person=person,
+            )
+            for person in persons
+        )
+        Measurement.objects.bulk_create(
+            Measurement(
+                weight=round(rnd.uniform(15.0, 350.0), 1),
+                chest=100,
+                waist=70,
+                hips=90,
+                hand=rnd.choice(hands) if rnd.random() < 0.5 else round(rnd.uniform(10.0, 30.0), 1),
+                local_date=self.date,
+                person_card=person_card,
+            )
+            for person_card in person_cards
+        )
+
+    def test_same_as_scalar(self) -> None:
+        for seed in range(3):
+            self.create_cohort(150, seed)
+        result = compute_standards(PersonCard.objects.all(), self.date)
+        self.assertEqual(len(result), PersonCard.objects.count())
+        for person_card in PersonCard.objects.all():
+            service = KBJYService(person_card, self.date)
+            self.assertEqual(result[person_card.pk]["imt"], service.get_imt())
+            self.assertEqual(result[person_card.pk]["standard"], service.calculate_standard())
+
+    def test_without_measurements(self) -> None:
+        PersonCard.objects.create(height=165, age=25, gender="female", activity=1.2, person=self.person2)
+        result = compute_standards(PersonCard.objects.all(), self.date)
+        self.assertEqual(list(result), [self.person_card1.pk])
+
+    def test_constant_queries(self) -> None:
+        self.create_cohort(50, 10)
+        with self.assertNumQueries(1):
+            compute_standards(PersonCard.objects.all(), self.date)
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from bood_app.models import DailyIntake
+from bood_app.services.kbjy import KBJYService
+from bood_app.tests.base_classes import BaseInitTestCase
+
+
+class DailyIntakeTestCase(BaseInitTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.token = self.get_authorization(1)
+        self.url = reverse("eating-list")
+        self.url_detail = reverse("eating-detail", args=(self.eating3.id,))
+        self.date = timezone.localdate()
+
+    def get_intake(self) -> DailyIntake:
+        return DailyIntake.objects.get(person_card=self.person_card1, date=self.date)
+
+    def test_model(self) -> None:
+        intake = self.get_intake()
+        self.assertEqual(str(intake), f"{self.person_card1.id}: {self.date}")
+
+    def test_created_with_eating(self) -> None:
+        intake = self.get_intake()
+        self.assertEqual(round(intake.calories), 497)
+        self.assertEqual(round(intake.water), 197)
+
+    def test_post_eating(self) -> None:
+        data = {"water": {"weight": 200}}
+        response = self.client.post(self.url, data, headers=self.token, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(round(self.get_intake().water), 397)
+
+    def test_patch_eating(self) -> None:
+        data = {"product_weight": {"product": 3, "weight": 100}}
+        response = self.client.patch(self.url_detail, data, headers=self.token, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        intake = self.get_intake()
+        self.assertEqual(round(intake.calories), 756)
+        self.assertEqual(round(intake.water), 131)
+
+    def test_delete_eating(self) -> None:
+        response = self.client.delete(self.url_detail, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(round(self.get_intake().water), 97)
+
+    def test_current_from_ledger(self) -> None:
+        service = KBJYService(self.person_card1, self.date)
+        with self.assertNumQueries(1):
+            current = service.get_current()
+        self.assertEqual(current["calories"], 497)
+
+    def test_rebuild_command(self) -> None:
+        DailyIntake.objects.all().update(calories=0.0, water=0.0)
+        call_command("rebuild_daily_intake", stdout=StringIO())
+        intake = self.get_intake()
+        self.assertEqual(round(intake.calories), 497)
+        self.assertEqual(round(intake.water), 197)
+
+    def test_product_nutrients_changed(self) -> None:
+        self.product1.calories = 1.0
+        self.product1.save()
+        self.assertTrue(DailyIntake.objects.filter(person_card=self.person_card1, date=self.date).exists())
+
+        self.product2.title = "Курица вареная"
+        with CaptureQueriesContext(connection) as queries:
+            self.product2.save(update_fields=["title"])
+        self.assertFalse([query for query in queries if "bood_app_dailyintake" in query["sql"]])
+
+        self.product2.calories = 3.0
+        self.product2.save()
+        self.assertFalse(DailyIntake.objects.filter(person_card=self.person_card1, date=self.date).exists())
+        self.assertEqual(KBJYService(self.person_card1, self.date).get_current()["calories"], 559)
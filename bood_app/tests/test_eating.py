@@ -1,4 +1,7 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
 from bood_app.models import Eating
@@ -20,7 +23,43 @@ class EatingTestCase(BaseInitTestCase):
     def test_get_valid(self) -> None:
         response = self.client.get(self.url, headers=self.token)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertTrue(response.data["results"][0]["product_weight"])
+        self.assertTrue(response.data["results"][-1]["product_weight"])
+
+    def get_pages(self, url: str) -> list:
+        pages = []
+        while url:
+            response = self.client.get(url, headers=self.token)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([eating["id"] for eating in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def test_cursor_pagination(self) -> None:
+        for _ in range(4):
+            Eating.objects.create(product_weight=None, recipe=self.recipe, person_card=self.person_card1)
+        # Одинаковое время добавления не влияет на страницы: курсор строится по id
+        Eating.objects.filter(person_card=self.person_card1).update(datetime_add=timezone.now())
+        expected = list(
+            Eating.objects.filter(person_card=self.person_card1).order_by("-id").values_list("id", flat=True)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            pages = self.get_pages(f"{self.url}?limit=2")
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertTrue(all(len(page) <= 2 for page in pages))
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"].upper()])
+        self.assertFalse([query for query in queries if "OFFSET" in query["sql"].upper()])
+
+    def test_cursor_pagination_stable_under_inserts(self) -> None:
+        for _ in range(3):
+            Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        response = self.client.get(self.url, {"limit": 2}, headers=self.token)
+        seen = [eating["id"] for eating in response.data["results"]]
+        Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        for page in self.get_pages(response.data["next"]):
+            seen.extend(page)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), Eating.objects.filter(person_card=self.person_card1).count() - 1)
 
     def test_get_detail_valid(self) -> None:
         response = self.client.get(self.url_detail, headers=self.token)
@@ -16,3 +16,13 @@ class FAQTestCase(BaseInitTestCase):
         response = self.client.get(self.url, headers=self.token)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data["results"][0]["question"])
+
+    def test_conditional_get(self) -> None:
+        etag = self.client.get(self.url, headers=self.token).headers["ETag"]
+        response = self.client.get(self.url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.faq.delete()
+        response = self.client.get(self.url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
@@ -0,0 +1,66 @@
+import numpy as np
+from django.urls import reverse
+from rest_framework import status
+
+from bood_app.models import Eating
+from bood_app.services.mealplan import MealPlanService, nnls
+from bood_app.tests.base_classes import BaseInitTestCase
+
+
+class NNLSTestCase(BaseInitTestCase):
+    def test_exact_solution(self) -> None:
+        a = np.array([[1.0, 0.0, 1.0], [0.0, 1.0, 1.0]])
+        b = np.array([2.0, 3.0])
+        x = nnls(a, b)
+        self.assertTrue((x >= 0).all())
+        np.testing.assert_allclose(a @ x, b, atol=1e-9)
+
+    def test_negative_solution_clipped(self) -> None:
+        a = np.array([[1.0, 1.0], [0.0, 1.0], [1.0, 0.0]])
+        b = np.array([1.0, 2.0, -1.0])
+        x = nnls(a, b)
+        unconstrained = np.linalg.lstsq(a, b, rcond=None)[0]
+        self.assertTrue((unconstrained < 0).any())
+        self.assertTrue((x >= 0).all())
+        np.testing.assert_allclose(x, [0.0, 1.5], atol=1e-9)
+
+
+class MealPlanTestCase(BaseInitTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.token = self.get_authorization(1)
+        self.url = reverse("mealplan")
+
+    def test_get_valid_meal_plan(self) -> None:
+        response = self.client.get(self.url, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        detail = response.data["detail"]
+        self.assertTrue(detail["products"])
+        for item in detail["products"]:
+            self.assertIn(item["product"]["id"], (self.product1.id, self.product3.id))
+            self.assertGreater(item["weight"], 0)
+
+        remaining = np.array([detail["remaining"][key] for key in ("calories", "proteins", "fats", "carbohydrates")])
+        planned = np.array([detail["planned"][key] for key in ("calories", "proteins", "fats", "carbohydrates")])
+        self.assertLess(np.abs(remaining - planned).sum(), remaining.sum())
+
+    def test_meal_plan_size(self) -> None:
+        plan = MealPlanService(self.person_card1).get_meal_plan(1)
+        self.assertEqual(len(plan["products"]), 1)
+
+    def test_meal_plan_standard_reached(self) -> None:
+        for _ in range(20):
+            Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        response = self.client.get(self.url, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["detail"]["products"], [])
+
+    def test_get_invalid_size(self) -> None:
+        for size in ("abc", "0", "11"):
+            response = self.client.get(self.url, {"size": size}, headers=self.token)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_meal_plan_queries(self) -> None:
+        MealPlanService(self.person_card1).get_meal_plan()
+        with self.assertNumQueries(4):
+            MealPlanService(self.person_card1).get_meal_plan()
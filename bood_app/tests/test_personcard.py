@@ -55,6 +55,23 @@ class PersonCardTestCase(BaseInitTestCase):
         self.assertEqual(response.data["status"], "400")
         self.assertEqual(response.data["error"], "You already have person card")
 
+    def test_post_invalid_time_zone(self) -> None:
+        data = {
+            "height": 175,
+            "age": 30,
+            "gender": "male",
+            "activity": "1.2",
+            "time_zone": "Mars/Olympus",
+            "femaletype": [],
+            "exclude_products": [1],
+            "exclude_category": [2],
+        }
+        token = self.get_authorization(2)
+        response = self.client.post(self.url, data, headers=token, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["status"], "400")
+        self.assertTrue(response.data["error"]["time_zone"])
+
     def test_post_invalid_height(self) -> None:
         data = {
             "height": 600,
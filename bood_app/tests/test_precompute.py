@@ -0,0 +1,74 @@
+from io import StringIO
+from multiprocessing import get_all_start_methods, get_context
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from bood_app.models import Eating, PrecomputedRecommendation
+from bood_app.services.kbjy import get_recommendation, get_recommendation_fingerprint
+from bood_app.tests.base_classes import BaseInitTestCase, BaseInitTransactionTestCase
+
+
+class PrecomputeTestCase(BaseInitTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.date = timezone.localdate()
+        Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        self.person_card1.refresh_from_db()
+
+    def test_command(self) -> None:
+        out = StringIO()
+        call_command("precompute_recommendations", workers=0, stdout=out)
+        self.assertIn("Recommendations precomputed: 1 cards", out.getvalue())
+        precomputed = PrecomputedRecommendation.objects.get(person_card=self.person_card1, date=self.date)
+        self.assertEqual(precomputed.kind, "include")
+        self.assertEqual(precomputed.products[0], self.product3.pk)
+        self.assertEqual(precomputed.fingerprint, get_recommendation_fingerprint(self.person_card1, self.date))
+
+    def test_command_error(self) -> None:
+        Eating.objects.filter(recipe=self.recipe).delete()
+        call_command("precompute_recommendations", workers=0, stdout=StringIO())
+        precomputed = PrecomputedRecommendation.objects.get(person_card=self.person_card1, date=self.date)
+        self.assertEqual(precomputed.kind, "error")
+        self.assertEqual(precomputed.error, "There are too low eating to make recommendations")
+
+    def test_serve_fresh(self) -> None:
+        PrecomputedRecommendation.objects.create(
+            person_card=self.person_card1,
+            date=self.date,
+            fingerprint=get_recommendation_fingerprint(self.person_card1, self.date),
+            kind="include",
+            products=[self.product1.pk],
+        )
+        self.assertEqual(get_recommendation(self.person_card1, self.date), {"include": [self.product1]})
+
+    def test_skip_stale(self) -> None:
+        PrecomputedRecommendation.objects.create(
+            person_card=self.person_card1, date=self.date, fingerprint="stale", kind="include", products=[1]
+        )
+        self.assertEqual(get_recommendation(self.person_card1, self.date), {"include": [self.product3]})
+
+
+class PrecomputeWorkersTestCase(BaseInitTransactionTestCase):
+    def setUp(self) -> None:
+        # Процессы пула открывают свои соединения и не видят БД в памяти
+        if connection.is_in_memory_db():
+            self.skipTest("worker processes need a file-backed test database")
+        super().setUp()
+        self.date = timezone.localdate()
+        Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+
+    def test_command_workers(self) -> None:
+        for method in get_all_start_methods():
+            with self.subTest(method=method), patch(
+                "bood_app.services.precompute.get_pool_context", return_value=get_context(method)
+            ):
+                PrecomputedRecommendation.objects.all().delete()
+                out = StringIO()
+                call_command("precompute_recommendations", workers=2, chunk_size=1, stdout=out)
+                self.assertIn("Recommendations precomputed: 1 cards", out.getvalue())
+                precomputed = PrecomputedRecommendation.objects.get(person_card=self.person_card1, date=self.date)
+                self.assertEqual(precomputed.kind, "include")
+                self.assertEqual(precomputed.products[0], self.product3.pk)
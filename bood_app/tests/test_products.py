@@ -1,8 +1,17 @@
+import gzip
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
-from bood_app.models import Vitamin, MicroElement
+from bood_app.models import Product, ProductWeight
+from bood_app.services.autocomplete import AutocompleteIndex, get_autocomplete_index, refresh_autocomplete_index
+from bood_app.services.fuzzy import levenshtein
+from bood_app.services.search import SEARCH_LIMIT, SearchBackend
 from bood_app.tests.base_classes import BaseInitTestCase
+from bood_app.utils.text import get_search_title
 
 
 class ProductTestCase(BaseInitTestCase):
@@ -11,11 +20,10 @@ class ProductTestCase(BaseInitTestCase):
         self.token = self.get_authorization(1)
         self.url = reverse("products-list")
         self.url_category = reverse("products_category-list")
+        self.url_autocomplete = reverse("products_autocomplete")
 
     def test_model(self) -> None:
         self.assertEqual(str(self.product1), self.product1.title)
-        self.assertEqual(str(self.vitamin1), f"Витамины для: {self.vitamin1.product.title}")
-        self.assertEqual(str(self.microelement1), f"Микроэлементы для: {self.microelement1.product.title}")
         self.assertEqual(str(self.category1), self.category1.title)
 
     def test_get_valid_products(self) -> None:
@@ -28,7 +36,261 @@ class ProductTestCase(BaseInitTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data["results"][0]["title"])
 
-    def test_signal(self) -> None:
-        self.product1.delete()
-        self.assertFalse(Vitamin.objects.filter(id=1))
-        self.assertFalse(MicroElement.objects.filter(id=1))
+    def test_nutrient_accessors(self) -> None:
+        self.product1.vitamins.c = 2.0
+        self.product1.microelements.iron = 0.5
+        self.product1.save()
+        product = Product.objects.get(pk=self.product1.pk)
+        self.assertEqual((product.vitamin_c, product.iron), (2.0, 0.5))
+        self.assertEqual((product.vitamins.c, product.microelements.iron), (2.0, 0.5))
+        with self.assertRaises(AttributeError):
+            product.vitamins.iron
+
+    def search(self, query: str, **params) -> list:
+        response = self.client.get(self.url, {"search": query, **params}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product["title"] for product in response.data["results"]]
+
+    def test_search_title(self) -> None:
+        self.assertEqual(get_search_title("Свёкла отварная"), "свекл отварн")
+        self.assertEqual(get_search_title("КУРИЦЫ"), get_search_title("курица"))
+        self.assertEqual(self.product2.search_title, "куриц")
+
+    def test_search_word_forms(self) -> None:
+        Product.objects.create(title="Свёкла отварная")
+        Product.objects.create(title="Курица жареная с луком")
+        self.assertEqual(self.search("курицы"), ["Курица", "Курица жареная с луком"])
+        self.assertEqual(self.search("КУР"), ["Курица", "Курица жареная с луком"])
+        self.assertEqual(self.search("свекла"), ["Свёкла отварная"])
+        self.assertEqual(self.search("жареная курица"), ["Курица жареная с луком"])
+        self.assertEqual(self.search("рыба"), [])
+        self.assertEqual(self.search("%"), [])
+
+    def test_search_index_sync(self) -> None:
+        self.product2.title = "Индейка"
+        self.product2.save(update_fields=["title"])
+        self.assertEqual(self.search("курица"), [])
+        self.assertEqual(self.search("индейки"), ["Индейка"])
+        self.product2.delete()
+        self.assertEqual(self.search("индейка"), [])
+
+    def test_search_fallback_backend(self) -> None:
+        Product.objects.create(title="Курица жареная с луком")
+        products = SearchBackend().search(Product.objects.all(), "курицы")
+        self.assertEqual([product.title for product in products], ["Курица", "Курица жареная с луком"])
+        self.assertFalse(SearchBackend().search(Product.objects.all(), "урица"))
+
+    def test_autocomplete(self) -> None:
+        kuraga = Product.objects.create(title="Курага")
+        Product.objects.create(title="Ёлочная свёкла")
+        ProductWeight.objects.bulk_create([ProductWeight(product=kuraga, weight=100) for _ in range(2)])
+
+        response = self.client.get(self.url_autocomplete, {"q": "КУР"}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["detail"]["products"],
+            [{"id": kuraga.id, "title": "Курага"}, {"id": self.product2.id, "title": "Курица"}],
+        )
+        response = self.client.get(self.url_autocomplete, {"q": "свек", "size": 1}, headers=self.token)
+        self.assertEqual([product["title"] for product in response.data["detail"]["products"]], ["Ёлочная свёкла"])
+        response = self.client.get(self.url_autocomplete, {"q": "ел"}, headers=self.token)
+        self.assertEqual(len(response.data["detail"]["products"]), 1)
+        response = self.client.get(self.url_autocomplete, headers=self.token)
+        self.assertEqual(response.data["detail"]["products"], [])
+
+    def test_autocomplete_without_queries(self) -> None:
+        index = get_autocomplete_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_autocomplete_index().search("лу"), [{"id": self.product1.id, "title": "Лук"}])
+        self.assertIs(get_autocomplete_index(), index)
+
+    def test_autocomplete_refresh(self) -> None:
+        index = get_autocomplete_index()
+        refresh_autocomplete_index()
+        self.assertIs(get_autocomplete_index(), index)
+        Product.objects.create(title="Лосось")
+        refresh_autocomplete_index()
+        self.assertNotEqual(get_autocomplete_index().version, index.version)
+        self.assertEqual(len(get_autocomplete_index().search("ло")), 1)
+
+    def test_autocomplete_unencoded_title(self) -> None:
+        index = AutocompleteIndex(0, [(1, "Crème brûlée ™", 0), (2, "Creme", 0)])
+        self.assertEqual(index.search("CRÈ"), [{"id": 1, "title": "Crème brûlée ™"}])
+        self.assertEqual(index.search("creme"), [{"id": 2, "title": "Creme"}])
+
+    def test_autocomplete_invalid_size(self) -> None:
+        response = self.client.get(self.url_autocomplete, {"q": "к", "size": 100}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_levenshtein(self) -> None:
+        self.assertEqual(levenshtein("курца", "курица", 2), 1)
+        self.assertEqual(levenshtein("малако", "молоко", 2), 2)
+        self.assertEqual(levenshtein("малако", "молоко", 1), 2)
+        self.assertEqual(levenshtein("лук", "батон", 1), 2)
+
+    def test_fuzzy_search(self) -> None:
+        Product.objects.create(title="Курицы бедро")
+        self.assertEqual(self.search("курца"), [])
+        self.assertEqual(self.search("курца", fuzzy=1), ["Курица"])
+        self.assertEqual(self.search("курица", fuzzy="true"), ["Курица", "Курицы бедро"])
+        self.assertEqual(self.search("бедро курицо", fuzzy=1), ["Курицы бедро"])
+        self.assertEqual(self.search("батн", fuzzy=1), ["Батон"])
+        self.assertEqual(self.search("лукк", fuzzy=1), ["Лук"])
+        self.assertEqual(self.search("лк", fuzzy=1), [])
+        self.assertEqual(self.search("молоко", fuzzy=1), [])
+
+    def test_fuzzy_search_catalog_change(self) -> None:
+        self.assertEqual(self.search("лососсь", fuzzy=1), [])
+        Product.objects.create(title="Лосось")
+        self.assertEqual(self.search("лососсь", fuzzy=1), ["Лосось"])
+
+    def test_conditional_get(self) -> None:
+        response = self.client.get(self.url, headers=self.token)
+        etag = response.headers["ETag"]
+        self.assertTrue(response.headers["Last-Modified"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse([query for query in queries if "bood_app_product" in query["sql"]])
+
+        Product.objects.create(title="Лосось")
+        response = self.client.get(self.url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_conditional_get_category(self) -> None:
+        etag = self.client.get(self.url_category, headers=self.token).headers["ETag"]
+        response = self.client.get(self.url_category, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.category1.title = "Напитки"
+        self.category1.save()
+        response = self.client.get(self.url_category, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def get_snapshot(self, **params) -> dict:
+        response = self.client.get(reverse("products_snapshot"), params, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return json.loads(gzip.decompress(content))
+
+    def test_snapshot(self) -> None:
+        snapshot = self.get_snapshot()
+        self.assertEqual(snapshot["version"], self.product3.version)
+        self.assertEqual(snapshot["deleted"], [])
+        products = [dict(zip(snapshot["fields"], row)) for row in snapshot["products"]]
+        self.assertEqual([product["title"] for product in products], ["Лук", "Курица", "Батон"])
+        self.assertEqual(products[0]["category"], self.category1.pk)
+        self.assertEqual(products[0]["carbohydrates_proportion"], 41.0)
+        self.assertEqual(products[0]["vitamin_c"], 0.0)
+        self.assertEqual(products[0]["iron"], 0.0)
+
+    def test_snapshot_delta(self) -> None:
+        since = self.get_snapshot()["version"]
+        self.assertEqual(self.get_snapshot(since=since)["products"], [])
+
+        self.product1.vitamins.c = 2.0
+        self.product1.save()
+        deleted = self.product3.pk
+        self.product3.delete()
+        snapshot = self.get_snapshot(since=since)
+        self.assertGreater(snapshot["version"], since)
+        self.assertEqual([row[0] for row in snapshot["products"]], [self.product1.pk])
+        self.assertEqual(snapshot["deleted"], [deleted])
+
+    def test_snapshot_not_modified(self) -> None:
+        url = reverse("products_snapshot")
+        etag = self.client.get(url, headers=self.token).headers["ETag"]
+        response = self.client.get(url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_snapshot_invalid_since(self) -> None:
+        response = self.client.get(reverse("products_snapshot"), {"since": "abc"}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_valid_product_detail(self) -> None:
+        response = self.client.get(reverse("products-detail", args=[self.product1.pk]), headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["category"]["title"], self.category1.title)
+        self.assertEqual(response.data["carbohydrates_proportion"], 41.0)
+        self.assertEqual(set(response.data["vitamins"]), {"a", "b1", "b2", "b3", "e", "c"})
+        self.assertEqual(set(response.data["microelements"]), {"iron", "calcium", "sodium", "potassium", "phosphorus"})
+
+    def test_product_detail_category_changed(self) -> None:
+        for url, params in (
+            (reverse("products-detail", args=[self.product1.pk]), {}),
+            (self.url, {"expand": "micro"}),
+        ):
+            etag = self.client.get(url, params, headers=self.token).headers["ETag"]
+            response = self.client.get(url, params, headers={**self.token, "If-None-Match": etag})
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            self.category1.description = f"Описание {url}"
+            self.category1.save()
+            response = self.client.get(url, params, headers={**self.token, "If-None-Match": etag})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+        etag = self.client.get(self.url, headers=self.token).headers["ETag"]
+        self.category1.save()
+        response = self.client.get(self.url, headers={**self.token, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_expand_micro_queries(self) -> None:
+        def get_queries() -> int:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {"expand": "micro"}, headers=self.token)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(all("vitamins" in product for product in response.data["results"]))
+            return len(queries)
+
+        before = get_queries()
+        for number in range(10):
+            Product.objects.create(title=f"Продукт {number}", category=self.category1)
+        self.assertEqual(get_queries(), before)
+        response = self.client.get(self.url, headers=self.token)
+        self.assertNotIn("vitamins", response.data["results"][0])
+
+    def get_titles(self, **params) -> list:
+        response = self.client.get(self.url, params, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product["title"] for product in response.data["results"]]
+
+    def test_nutrient_range_filter(self) -> None:
+        self.assertEqual(self.get_titles(proteins_min=3), ["Лук", "Батон"])
+        self.assertEqual(self.get_titles(proteins_min=3, calories_per_100_max=100), ["Лук"])
+        self.assertEqual(self.get_titles(carbohydrates_max=1, fats_min=1), ["Курица"])
+        self.assertEqual(self.get_titles(search="курица", calories_per_100_min=300), [])
+        response = self.client.get(self.url, {"fats_max": "много"}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"fats_max": "nan"}, headers=self.token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_beyond_limit(self) -> None:
+        Product.objects.bulk_create(
+            Product(
+                title=f"Молоко {number}",
+                search_title=get_search_title(f"Молоко {number}"),
+                proteins_proportion=5 if number % 500 == 1 else 3,
+            )
+            for number in range(1, SEARCH_LIMIT + 2)
+        )
+        response = self.client.get(self.url, {"search": "молоко"}, headers=self.token)
+        self.assertEqual(response.data["count"], SEARCH_LIMIT + 1)
+        titles = self.get_titles(search="молоко", proteins_min=5)
+        self.assertEqual(titles, ["Молоко 1", "Молоко 501", "Молоко 1001"])
+        titles = self.get_titles(search="молоко", ordering="-proteins_proportion")
+        self.assertEqual(titles[:4], ["Молоко 1", "Молоко 501", "Молоко 1001", "Молоко 2"])
+
+    def test_proteins_density_ordering(self) -> None:
+        self.assertAlmostEqual(self.product2.proteins_density, 0.182 / 2.38)
+        self.assertEqual(self.get_titles(ordering="-proteins_density"), ["Курица", "Лук", "Батон"])
+        self.assertEqual(self.get_titles(ordering="calories", proteins_min=3), ["Лук", "Батон"])
+
+        self.product3.proteins = 0.5
+        self.product3.save(update_fields=["proteins"])
+        self.product3.refresh_from_db()
+        self.assertAlmostEqual(self.product3.proteins_density, 0.5 / 2.59)
+        self.assertEqual(self.get_titles(ordering="-proteins_density")[0], "Батон")
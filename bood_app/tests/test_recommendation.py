@@ -1,7 +1,14 @@
+import time
+
+import numpy as np
 from django.urls import reverse
 from rest_framework import status
 
-from bood_app.models import Eating
+from bood_app.models import Eating, Product
+from bood_app.services.caching import cache_accessed, get_counter
+from bood_app.services.exclusion import ProductIdSet, get_excluded_products
+from bood_app.services.kbjy import get_recommendation
+from bood_app.services.product_index import MATRIX_PREFIX, clear_product_index, get_matrix_path, get_product_index
 from bood_app.tests.base_classes import BaseInitTestCase
 
 
@@ -54,3 +61,88 @@ class RecommendationTestCase(BaseInitTestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.data["status"], "400")
         self.assertEqual(response.data["error"], "There are too low eating to make recommendations")
+
+    def test_product_index_nearest(self) -> None:
+        index = get_product_index()
+        self.assertEqual(index.nearest((3.0, 1.0, 22.0)), [3, 1, 2])
+        self.assertEqual(index.nearest((3.0, 1.0, 22.0), k=1, exclude=ProductIdSet.from_ids([3])), [1])
+        self.assertEqual(index.nearest((3.0, 1.0, 22.0), max_distance=1.0), [3])
+
+    def test_product_index_refresh(self) -> None:
+        index = get_product_index()
+        with self.assertNumQueries(1):
+            self.assertIs(get_product_index(), index)
+        Product.objects.create(title="Рис", proteins_proportion=3.0, fats_proportion=1.0, carbohydrates_proportion=22.0)
+        index = get_product_index()
+        self.assertEqual(index.nearest((3.0, 1.0, 22.0), k=2), [4, 3])
+
+    def test_product_matrix(self) -> None:
+        index = get_product_index()
+        self.assertIsInstance(index.matrix.values, np.memmap)
+        self.assertFalse(index.matrix.values.flags.writeable)
+        self.assertEqual(index.matrix.get_column("calories").tolist(), [0.41, 2.38, 2.59])
+        self.assertEqual(index.nutrients[:, 0].tolist(), [0.41, 2.38, 2.59])
+        self.assertEqual(index.richest([1, 2, 3], "fats"), 2)
+        self.assertEqual(index.richest([1, 3, 100], "carbohydrates"), 3)
+        self.assertIsNone(index.richest([100], "fats"))
+
+        clear_product_index()
+        with self.assertNumQueries(1):
+            get_product_index()
+        path = get_matrix_path(index.state)
+        # Матрица другой базы данных с меньшим номером версии, но изменением позже
+        foreign = path.with_name(f"{MATRIX_PREFIX}1-{int(time.time() * 1000000) + 10**9}")
+        foreign.mkdir()
+        Product.objects.create(title="Рис", proteins_proportion=3.0, fats_proportion=1.0, carbohydrates_proportion=22.0)
+        self.assertEqual(get_product_index().ids.tolist(), [1, 2, 3, 4])
+        self.assertFalse(path.exists())
+        self.assertTrue(foreign.exists())
+
+    def test_excluded_products(self) -> None:
+        self.person_card1.refresh_from_db()
+        with self.assertNumQueries(1):
+            exclusion = get_excluded_products(self.person_card1)
+        self.assertEqual(exclusion.ids.tolist(), [2])
+
+        self.person_card1.exclude_products.add(self.product1)
+        self.person_card1.refresh_from_db()
+        with self.assertNumQueries(1):
+            exclusion = get_excluded_products(self.person_card1)
+        self.assertEqual(exclusion.ids.tolist(), [1, 2])
+        self.assertIn(1, exclusion)
+        self.assertNotIn(3, exclusion)
+
+        self.category2.personcard.remove(self.person_card1)
+        self.person_card1.refresh_from_db()
+        self.assertEqual(get_excluded_products(self.person_card1).ids.tolist(), [1])
+
+        Product.objects.create(title="Соль")
+        self.assertEqual(get_excluded_products(self.person_card1).ids.tolist(), [1, 4])
+
+    def test_recommendation_cache(self) -> None:
+        self.eating4 = Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        self.person_card1.refresh_from_db()
+        counter = get_counter("recommendation")
+        counter.reset()
+        accessed = []
+
+        def receiver(sender, name, key, hit, **kwargs) -> None:
+            accessed.append((name, hit))
+
+        cache_accessed.connect(receiver)
+        self.addCleanup(cache_accessed.disconnect, receiver)
+
+        result = get_recommendation(self.person_card1)
+        with self.assertNumQueries(2):
+            self.assertEqual(get_recommendation(self.person_card1), result)
+        self.assertEqual((counter.hits, counter.misses), (1, 1))
+        self.assertEqual(accessed.count(("recommendation", True)), 1)
+
+        Eating.objects.create(recipe=self.recipe, person_card=self.person_card1)
+        get_recommendation(self.person_card1)
+        self.assertEqual((counter.hits, counter.misses), (1, 2))
+
+        self.person_card1.exclude_products.add(self.product3)
+        get_recommendation(self.person_card1)
+        self.assertEqual((counter.hits, counter.misses), (1, 3))
+        self.assertEqual(counter.ratio, 0.25)
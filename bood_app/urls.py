@@ -3,13 +3,18 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     ProductViewSet,
+    ProductAutocompleteView,
+    ProductSnapshotView,
     PersonCardView,
     EatingViewSet,
     StandardValuesView,
     CurrentValuesView,
+    HistoryValuesView,
+    SummaryValuesView,
     MeasurementViewSet,
     RecipeViewSet,
     RecommendationValuesView,
+    MealPlanView,
     FemaleTypeViewSet,
     ProductCategoryViewSet,
     FAQViewSet,
@@ -26,8 +31,13 @@ router.register(r"recipes", RecipeViewSet, basename="recipes")
 router.register(r"faq", FAQViewSet, basename="faq")
 
 urlpatterns = [
+    path("products/autocomplete/", ProductAutocompleteView.as_view(), name="products_autocomplete"),
+    path("products/snapshot/", ProductSnapshotView.as_view(), name="products_snapshot"),
     path("", include(router.urls)),
     path("calculate/standard/", StandardValuesView.as_view(), name="standard"),
     path("calculate/current/", CurrentValuesView.as_view(), name="current"),
+    path("calculate/summary/", SummaryValuesView.as_view(), name="summary"),
+    path("calculate/history/", HistoryValuesView.as_view(), name="history"),
     path("recommendation/", RecommendationValuesView.as_view(), name="recommendation"),
+    path("mealplan/", MealPlanView.as_view(), name="mealplan"),
 ]
@@ -0,0 +1,34 @@
+import datetime
+from typing import Optional
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+HISTORY_MAX_DAYS = 366
+
+
+def get_date(str_date: Optional[str], default: Optional[datetime.date] = None) -> datetime.date:
+    """
+    Преобразование строки запроса в дату
+    """
+    if not str_date:
+        return default or timezone.localdate()
+    try:
+        return datetime.datetime.strptime(str_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({"status": 400, "error": "Invalid date format"})
+
+
+def get_date_range(
+    str_date_from: Optional[str], str_date_to: Optional[str], today: Optional[datetime.date] = None
+) -> tuple:
+    """
+    Проверка периода дат, по умолчанию последние 30 дней
+    """
+    date_to = get_date(str_date_to, today)
+    date_from = get_date(str_date_from, date_to - datetime.timedelta(days=29))
+    if date_from > date_to:
+        raise ValidationError({"status": 400, "error": "Invalid date range"})
+    if (date_to - date_from).days >= HISTORY_MAX_DAYS:
+        raise ValidationError({"status": 400, "error": "Date range is too long"})
+    return date_from, date_to
@@ -0,0 +1,70 @@
+import json
+from typing import Iterator, TextIO
+
+JSON_CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+
+
+def iter_json_object(file: TextIO, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Пары ключ-значение JSON-объекта верхнего уровня по одной, файл читается частями
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, position, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                position += 1
+                return buffer[position - 1]
+            if not read_more():
+                raise ValueError("Unexpected end of JSON")
+
+    def decode():
+        nonlocal position
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not read_more():
+                    raise
+                continue
+            # Число в конце буфера могло быть прочитано не полностью
+            if end == len(buffer) and not eof and read_more():
+                continue
+            position = end
+            return value
+
+    if next_char() != "{":
+        raise ValueError("JSON object expected")
+    char = next_char()
+    while char != "}":
+        if char != '"':
+            raise ValueError("JSON object key expected")
+        position -= 1
+        key = decode()
+        if next_char() != ":":
+            raise ValueError("':' expected after JSON object key")
+        next_char()
+        position -= 1
+        yield key, decode()
+        char = next_char()
+        if char == ",":
+            char = next_char()
+        elif char != "}":
+            raise ValueError("',' or '}' expected in JSON object")
@@ -0,0 +1,10 @@
+from typing import Optional
+
+
+def get_proteins_density(proteins: Optional[float], calories: Optional[float]) -> float:
+    """
+    Граммы белка на килокалорию продукта
+    """
+    if not proteins or not calories:
+        return 0.0
+    return proteins / calories
@@ -22,3 +22,12 @@ ACTIVITY_TYPE = (
     ("1.7", "Физический труд средней тяжести (ежедневные тренировки)"),
     ("1.9", "Тяжелый физический труд (профессиональные спортсмены)"),
 )
+
+# Recommendation resources
+
+RECOMMENDATION_KIND = (
+    ("include", "Включить"),
+    ("exclude", "Исключить"),
+    ("none", "Нет рекомендаций"),
+    ("error", "Ошибка"),
+)
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from rest_framework.exceptions import ValidationError
+
+
+def get_size(str_size: Optional[str], default: int, maximum: int) -> int:
+    """
+    Проверка количества элементов в ответе
+    """
+    if not str_size:
+        return default
+    try:
+        size = int(str_size)
+    except ValueError:
+        raise ValidationError({"status": 400, "error": "Invalid size format"})
+    if not 1 <= size <= maximum:
+        raise ValidationError({"status": 400, "error": f"Size must be between 1 and {maximum}"})
+    return size
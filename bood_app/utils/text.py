@@ -0,0 +1,75 @@
+import re
+
+VOWELS = "аеиоуыэюя"
+RV = re.compile(rf"^(.*?[{VOWELS}])(.*)$")
+PERFECTIVE_GERUND = re.compile(r"((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$")
+REFLEXIVE = re.compile(r"(с[яь])$")
+ADJECTIVE = re.compile(r"(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$")
+PARTICIPLE = re.compile(r"((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$")
+VERB = re.compile(
+    r"((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)"
+    r"|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$"
+)
+NOUN = re.compile(
+    r"(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$"
+)
+# Суффикс -ость должен находиться в области R2 слова
+DERIVATIONAL = re.compile(rf"^[{VOWELS}]*[^{VOWELS}]+[{VOWELS}]+[^{VOWELS}].*ость?$")
+DERIVATIONAL_SUFFIX = re.compile(r"ость?$")
+SUPERLATIVE = re.compile(r"(ейше|ейш)$")
+WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Приведение к нижнему регистру с заменой ё на е
+    """
+    return text.casefold().replace("ё", "е")
+
+
+def stem(word: str) -> str:
+    """
+    Основа русского слова по алгоритму Портера (Snowball), прочие слова возвращаются без изменений
+    """
+    match = RV.match(word)
+    if match is None:
+        return word
+    prefix, rv = match.groups()
+
+    result = PERFECTIVE_GERUND.sub("", rv, 1)
+    if result == rv:
+        rv = REFLEXIVE.sub("", rv, 1)
+        result = ADJECTIVE.sub("", rv, 1)
+        if result != rv:
+            rv = PARTICIPLE.sub("", result, 1)
+        else:
+            result = VERB.sub("", rv, 1)
+            rv = NOUN.sub("", rv, 1) if result == rv else result
+    else:
+        rv = result
+
+    rv = re.sub("и$", "", rv, 1)
+    if DERIVATIONAL.search(rv):
+        rv = DERIVATIONAL_SUFFIX.sub("", rv, 1)
+
+    result = re.sub("ь$", "", rv, 1)
+    if result == rv:
+        rv = SUPERLATIVE.sub("", rv, 1)
+        rv = re.sub("нн$", "н", rv, 1)
+    else:
+        rv = result
+    return prefix + rv
+
+
+def get_search_tokens(text: str) -> list:
+    """
+    Нормализованные основы слов строки
+    """
+    return [stem(word) for word in WORD.findall(normalize_text(text))]
+
+
+def get_search_title(text: str) -> str:
+    """
+    Строка основ слов для поискового индекса
+    """
+    return " ".join(get_search_tokens(text))
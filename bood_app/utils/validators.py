@@ -0,0 +1,13 @@
+import zoneinfo
+
+from django.core.exceptions import ValidationError
+
+
+def validate_timezone(value: str) -> None:
+    """
+    Проверка названия часового пояса
+    """
+    try:
+        zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError("Unknown time zone")
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from rest_framework.exceptions import ValidationError
+
+
+def get_since(str_since: Optional[str]) -> int:
+    """
+    Проверка версии каталога, после которой клиенту нужны изменения
+    """
+    if not str_since:
+        return 0
+    try:
+        since = int(str_since)
+    except ValueError:
+        raise ValidationError({"status": 400, "error": "Invalid since format"})
+    if since < 0:
+        raise ValidationError({"status": 400, "error": "Since must not be negative"})
+    return since
@@ -1,3 +1,5 @@
+from django.http import FileResponse, HttpResponse
+from django.utils.decorators import method_decorator
 from rest_framework import viewsets, mixins
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
@@ -5,22 +7,38 @@ from rest_framework.response import Response
 
 from .api_docs import (
     product_list_summary,
+    product_autocomplete_summary,
+    product_snapshot_summary,
     person_card_summary,
     measurement_summary,
     recipe_summary,
     eating_summary,
     calculate_current_retrieve_summary,
     calculate_standard_retrieve_summary,
+    calculate_history_retrieve_summary,
+    calculate_summary_retrieve_summary,
     female_type_summary,
     recommendation_summary,
+    mealplan_summary,
     categoryrecommendation_list_summary,
     faq_list_summary,
 )
-from .filters import TitleSearchFilter, DateSearchFilter
+from .filters import (
+    TitleSearchFilter,
+    DateSearchFilter,
+    ProductSearchFilter,
+    NutrientRangeFilter,
+    ProductOrderingFilter,
+)
 from .models import Product, PersonCard, Eating, Measurement, Recipe, FemaleType, ProductCategory, FAQ
+from .pagination import IdCursorPagination
 from .permissions import IsOwnerOrAdminPersonCard, IsOwnerOrAdmin
+from .services.catalog import catalog_condition, get_catalog_state
+from .services.snapshot import get_catalog_delta, get_catalog_snapshot
 from .serializers import (
     ProductSerializer,
+    ProductDetailSerializer,
+    ProductAutocompleteSerializer,
     PostPersonCardSerializer,
     GetPersonCardSerializer,
     MeasurementSerializer,
@@ -29,25 +47,89 @@ from .serializers import (
     PostEatingSerializer,
     GetEatingSerializer,
     CalculateSerializer,
+    HistorySerializer,
+    SummarySerializer,
     RecommendationSerializer,
+    MealPlanSerializer,
     FemaleTypeSerializer,
     ProductCategorySerializer,
     FAQSerializer,
 )
+from .utils.version_validation import get_since
 from .utils.view_validation import view_validation, calculate_view_validation
 
 
+def is_micro_expanded(request) -> bool:
+    return "micro" in request.GET.get("expand", "").split(",")
+
+
 @product_list_summary
-class ProductViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+# Полный профиль вкладывает категорию, поэтому его ETag зависит и от версии категорий
+@method_decorator(catalog_condition("product", ("category",), is_micro_expanded), name="list")
+@method_decorator(catalog_condition("product", ("category",)), name="retrieve")
+class ProductViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = Product.objects.all().order_by("id")
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "head", "options"]
-    filter_backends = [TitleSearchFilter]
+    filter_backends = [ProductSearchFilter, NutrientRangeFilter, ProductOrderingFilter]
     search_fields = ["title"]
+    ordering_fields = [
+        "proteins_density",
+        "calories",
+        "proteins_proportion",
+        "fats_proportion",
+        "carbohydrates_proportion",
+    ]
+    # Не перекрывает products/category/ и другие вложенные пути
+    lookup_value_regex = r"\d+"
+
+    def is_expanded(self) -> bool:
+        """
+        Полный профиль нутриентов: в карточке продукта всегда, в списке - с expand=micro
+        """
+        return self.action == "retrieve" or is_micro_expanded(self.request)
+
+    def get_queryset(self):
+        if self.is_expanded():
+            return super().get_queryset().select_related("category")
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.is_expanded():
+            return ProductDetailSerializer
+        return super().get_serializer_class()
+
+
+class ProductAutocompleteView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @product_autocomplete_summary
+    def get(self, request, *args, **kwargs) -> Response:
+        query = request.query_params.get("q", None)
+        size = request.query_params.get("size", None)
+        serializer = ProductAutocompleteSerializer(data=request.data, context={"q": query, "size": size})
+        return calculate_view_validation(serializer)
+
+
+class ProductSnapshotView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @product_snapshot_summary
+    @method_decorator(catalog_condition("product"))
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        since = get_since(request.query_params.get("since", None))
+        state = get_catalog_state("product")
+        if since:
+            response = HttpResponse(get_catalog_delta(state, since), content_type="application/json")
+        else:
+            response = FileResponse(get_catalog_snapshot(state).open("rb"), content_type="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+        return response
 
 
 @categoryrecommendation_list_summary
+@method_decorator(catalog_condition("category"), name="list")
 class ProductCategoryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = ProductCategory.objects.all().order_by("id")
     serializer_class = ProductCategorySerializer
@@ -58,6 +140,7 @@ class ProductCategoryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 
 
 @faq_list_summary
+@method_decorator(catalog_condition("faq"), name="list")
 class FAQViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = FAQ.objects.all().order_by("id")
     serializer_class = FAQSerializer
@@ -68,6 +151,7 @@ class FAQViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
 
 
 @female_type_summary
+@method_decorator(catalog_condition("femaletype"), name="list")
 class FemaleTypeViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     queryset = FemaleType.objects.all().order_by("id")
     serializer_class = FemaleTypeSerializer
@@ -115,6 +199,7 @@ class EatingViewSet(viewsets.ModelViewSet):
     serializer_class = GetEatingSerializer
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    pagination_class = IdCursorPagination
     filter_backends = [DateSearchFilter]
     search_fields = ["datetime_add"]
 
@@ -165,12 +250,38 @@ class CurrentValuesView(RetrieveAPIView):
         return calculate_view_validation(serializer)
 
 
+class SummaryValuesView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @calculate_summary_retrieve_summary
+    def get(self, request, *args, **kwargs) -> Response:
+        date = request.query_params.get("date", None)
+        user_id = request.user.id
+        serializer = SummarySerializer(data=request.data, context={"date": date, "user_id": user_id})
+        return calculate_view_validation(serializer)
+
+
+class HistoryValuesView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @calculate_history_retrieve_summary
+    def get(self, request, *args, **kwargs) -> Response:
+        date_from = request.query_params.get("from", None)
+        date_to = request.query_params.get("to", None)
+        user_id = request.user.id
+        serializer = HistorySerializer(
+            data=request.data, context={"date_from": date_from, "date_to": date_to, "user_id": user_id}
+        )
+        return calculate_view_validation(serializer)
+
+
 @measurement_summary
 class MeasurementViewSet(viewsets.ModelViewSet):
     queryset = Measurement.objects.all()
     serializer_class = MeasurementSerializer
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         if self.request.user:
@@ -194,6 +305,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = GetRecipeSerializer
     http_method_names = ["get", "post", "patch", "delete", "head", "options"]
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    pagination_class = IdCursorPagination
     filter_backends = [TitleSearchFilter]
     search_fields = ["title"]
 
@@ -226,3 +338,15 @@ class RecommendationValuesView(RetrieveAPIView):
         user_id = request.user.id
         serializer = RecommendationSerializer(data=request.data, context={"user_id": user_id})
         return calculate_view_validation(serializer)
+
+
+class MealPlanView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @mealplan_summary
+    def get(self, request, *args, **kwargs) -> Response:
+        date = request.query_params.get("date", None)
+        size = request.query_params.get("size", None)
+        user_id = request.user.id
+        serializer = MealPlanSerializer(data=request.data, context={"date": date, "size": size, "user_id": user_id})
+        return calculate_view_validation(serializer)